@@ -8,18 +8,19 @@ from PyQt6.QtWidgets import (
     QApplication, QDialog, QDialogButtonBox, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QPushButton, QLineEdit, QTextEdit, QPlainTextEdit,
     QCheckBox, QComboBox, QListWidget, QListWidgetItem,
-    QTableView, QHeaderView, QAbstractItemView,
+    QTableView, QAbstractItemView,
     QGroupBox, QRadioButton, QTabWidget, QGridLayout,
     QMessageBox, QProgressDialog, QWidget, QStyle,
     QStyledItemDelegate, QSizePolicy, QSplitter
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import (
     QColor, QFont, QTextDocument, QAbstractTextDocumentLayout,
     QTextCursor, QKeySequence, QShortcut
 )
 
-from .models import ReviewTableModel, HtmlDelegate, to_qt_pos
+from tools.unicode_utils import to_qt_pos
+from .models import ReviewTableModel, HtmlDelegate
 from .workers import ReviewDiffWorker
 from .templates import TemplateManager, TemplateEditorDialog
 
@@ -175,10 +176,17 @@ class FindReplaceDialog(QDialog):
         self.review_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.review_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.review_table.verticalHeader().setVisible(False)
-        self.review_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        # 行高只按内容计算可见行（见 _resize_visible_review_rows）；
+        # ResizeToContents 每次布局都会对所有行排版一遍
         self.review_table.horizontalHeader().setStretchLastSection(True)
         # Custom Delegate
-        self.review_table.setItemDelegate(HtmlDelegate(self.review_table))
+        review_delegate = HtmlDelegate(self.review_table)
+        self.review_table.setItemDelegate(review_delegate)
+        self._sized_review_rows = set()
+        review_delegate.sizeHintChanged.connect(lambda _index: self._reset_review_row_heights())
+        v_bar = self.review_table.verticalScrollBar()
+        v_bar.valueChanged.connect(lambda _value: self._resize_visible_review_rows())
+        v_bar.rangeChanged.connect(lambda _min, _max: self._resize_visible_review_rows())
         
         # Double click to jump
         self.review_table.doubleClicked.connect(self.on_review_table_dbl_click)
@@ -604,6 +612,7 @@ class FindReplaceDialog(QDialog):
         scope_str = "Current Page" if not is_global else "Global Project"
         
         if is_global:
+            self.mainwindow.flush_pending_edits() # 页面字典可能还没收到最近的输入
             target_dict = self.mainwindow.pages_left if self.rb_left.isChecked() else self.mainwindow.pages_right_text
             for txt in target_dict.values():
                 try: count += len(list(regex.finditer(txt)))
@@ -1126,6 +1135,7 @@ class FindReplaceDialog(QDialog):
     def on_count(self):
         regex = self._compile_regex_from_ui()
         if not regex: return
+        self.mainwindow.flush_pending_edits() # 全局计数读页面字典，先写回未提交的输入
         
         # Current Page Count
         editor = self.get_target_editor()
@@ -1151,16 +1161,14 @@ class FindReplaceDialog(QDialog):
         self.on_review(is_global=True, find_only=True)
 
     def select_all_review(self):
-        if not self.review_table.model(): return
-        for i in range(self.review_table.model().rowCount()):
-            self.review_table.model()._data[i]['checked'] = True
-        self.review_table.model().layoutChanged.emit() # Refresh all
+        m = self.review_table.model()
+        if not m: return
+        m.set_checked_range(range(m.rowCount()), True)
         
     def deselect_all_review(self):
-        if not self.review_table.model(): return
-        for i in range(self.review_table.model().rowCount()):
-            self.review_table.model()._data[i]['checked'] = False
-        self.review_table.model().layoutChanged.emit()
+        m = self.review_table.model()
+        if not m: return
+        m.set_checked_range(range(m.rowCount()), False)
 
     def toggle_review_selection(self):
         rows = sorted(set(index.row() for index in self.review_table.selectedIndexes()))
@@ -1170,24 +1178,19 @@ class FindReplaceDialog(QDialog):
         # User said "Select items then check/uncheck".
         # If mixed, maybe set all to Checked? Or Unchecked?
         # Standard: Flip each.
-        
-        m = self.review_table.model()
-        for r in rows:
-            m._data[r]['checked'] = not m._data[r]['checked']
-            
-        # Optimize emit?
-        # model.dataChanged for specific rows?
-        # LayoutChanged is easiest for now.
-        m.layoutChanged.emit()
+        self.review_table.model().set_checked_range(rows)
 
     def on_review(self, is_global=False, find_only=False):
         # 1. Clear previous
         self.save_search_history()
         self.current_review_items = []
+        self._context_html_pool = {} # 相同的上下文 HTML 只存一份
         self.review_is_global = is_global
         self.review_target_is_left = self.rb_left.isChecked()
         if is_global:
             self.mainwindow.save_current_page_data()
+        else:
+            self.mainwindow.flush_pending_edits()
         
         regex = self._compile_regex_from_ui()
         if not regex: return
@@ -1222,11 +1225,11 @@ class FindReplaceDialog(QDialog):
             self.review_table.setModel(self.model)
             # Resize
             self.review_table.resizeColumnsToContents()
-            self.review_table.resizeRowsToContents()
             self.review_table.horizontalHeader().setStretchLastSection(True)
             # Set Col 0 width fix
             self.review_table.setColumnWidth(0, 30)
             self.review_table.setColumnWidth(4, 400) # Give more space to context
+            self._reset_review_row_heights()
                 
         finally:
             QApplication.restoreOverrideCursor()
@@ -1325,6 +1328,7 @@ class FindReplaceDialog(QDialog):
                 # Diff style
                 new_esc = html.escape(new_t)
                 diff_html = f"{prefix}<span style='background-color:#ffcccc; text-decoration:line-through;'>{orig_esc}</span> <span style='background-color:#ccffcc;'><b>{new_esc}</b></span>{suffix}"
+            diff_html = self._context_html_pool.setdefault(diff_html, diff_html)
             
             item_data = {
                 'page_num': page_num,
@@ -1338,6 +1342,29 @@ class FindReplaceDialog(QDialog):
             }
             self.current_review_items.append(item_data)
         
+    def _reset_review_row_heights(self):
+        """列宽或数据变了：已算好的行高作废，重新计算可见行"""
+        self._sized_review_rows.clear()
+        self._resize_visible_review_rows()
+        # 刚显示的表格视口尺寸要等布局完成后才准确
+        QTimer.singleShot(0, self._resize_visible_review_rows)
+
+    def _resize_visible_review_rows(self):
+        """按内容调整视口内各行的行高；其余行保持默认高度，滚动到时再算"""
+        table = self.review_table
+        model = table.model()
+        if model is None:
+            return
+        count = model.rowCount()
+        row = max(table.rowAt(0), 0)
+        height = table.viewport().height()
+        # 逐行调整会推动后面的行，所以每次重新取位置
+        while row < count and table.rowViewportPosition(row) < height:
+            if row not in self._sized_review_rows:
+                self._sized_review_rows.add(row)
+                table.resizeRowToContents(row)
+            row += 1
+
     def close_review(self):
         self.review_group.setVisible(False)
         self.tabs.setVisible(True)
@@ -1472,6 +1499,8 @@ class FindReplaceDialog(QDialog):
         target_is_left = self.rb_left.isChecked()
         self.review_target_is_left = target_is_left
         target_side = "Left" if target_is_left else "Right"
+        # 差异在后台线程按页面字典计算，先写回编辑器中未提交的输入
+        self.mainwindow.save_current_page_data()
         
         # 3. Pages
         start_page = self.mainwindow.project_config.get('start_page', 1)
@@ -1546,7 +1575,7 @@ class FindReplaceDialog(QDialog):
         self.btn_rev_cancel.setText("Cancel Review")
         self.review_table.setColumnWidth(0, 30)
         self.review_table.setColumnWidth(4, 400)
-        self.review_table.resizeRowsToContents()
+        self._reset_review_row_heights()
         self.status_label.setText(
             f"Found {len(self.current_review_items)} diff items.{cache_note}"
         )
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from PyQt6.QtWidgets import (
     QStyle, QStyledItemDelegate
 )
@@ -43,6 +45,16 @@ class ReviewTableModel(QAbstractTableModel):
             return True
         return False
 
+    def set_checked_range(self, rows, checked=None):
+        """批量勾选 rows（checked=None 时逐行取反），只发一次 dataChanged"""
+        if not rows: return
+        for r in rows:
+            item = self._data[r]
+            item['checked'] = (not item['checked']) if checked is None else checked
+        # 只有勾选列变化，不触发整表重排和行高重算
+        self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), 0),
+                              [Qt.ItemDataRole.CheckStateRole])
+
     def headerData(self, section, orientation, role):
         if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
             return self._headers[section]
@@ -55,26 +67,70 @@ class ReviewTableModel(QAbstractTableModel):
         return f
 
 class HtmlDelegate(QStyledItemDelegate):
+    _DOC_CACHE_SIZE = 256
+    _SIZE_CACHE_SIZE = 4096
+    _WIDTH_STEP = 8 # 排版宽度按 8px 取整，拖动列宽时不必逐像素重排
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # (html, width, font) -> 已排版的 QTextDocument；按内容命中，行数据或列宽变了自然换键
+        self._doc_cache = OrderedDict()
+        # 同样的键 -> QSize；行高计算要遍历所有行，只存尺寸可以多存很多
+        self._size_cache = OrderedDict()
+        self._last_width = None
+        if parent is not None and hasattr(parent, 'horizontalHeader'):
+            parent.horizontalHeader().sectionResized.connect(self._on_section_resized)
+
+    def _bucket(self, width):
+        return width - width % self._WIDTH_STEP
+
+    def _on_section_resized(self, logical_index, old_size, new_size):
+        if logical_index != 4:
+            return
+        width = self._bucket(new_size - 10)
+        if width == self._last_width:
+            return
+        self._last_width = width
+        model = self.parent().model()
+        if model is not None and model.rowCount() > 0:
+            # 视图收到任一 sizeHintChanged 都会整体延迟重排，发一次即可
+            self.sizeHintChanged.emit(model.index(0, 4))
+
+    def _layout_doc(self, html, width, font):
+        # 不能换成 QStaticText：它不绘制 span 的 background-color，差异高亮会丢失
+        key = (html, width, font.key())
+        doc = self._doc_cache.get(key)
+        if doc is not None:
+            self._doc_cache.move_to_end(key)
+            return doc
+        if len(self._doc_cache) >= self._DOC_CACHE_SIZE:
+            # 缓存已满时复用被淘汰的文档对象，未命中也不再新建/销毁 QTextDocument
+            _old_key, doc = self._doc_cache.popitem(last=False)
+        else:
+            doc = QTextDocument()
+        doc.setDefaultFont(font)
+        doc.setHtml(html)
+        doc.setTextWidth(width)
+        self._doc_cache[key] = doc
+        return doc
+
     def paint(self, painter, option, index):
         if index.column() == 4:
             painter.save()
             
-            doc = QTextDocument()
             html = index.model()._data[index.row()].get('context_html', '')
             
             # Subtract padding
-            width = option.rect.width() - 10
+            width = self._bucket(option.rect.width() - 10)
             if width <= 0: width = 200
             
-            doc.setHtml(html)
-            doc.setTextWidth(width)
-            doc.setDefaultFont(option.font)
+            doc = self._layout_doc(html, width, option.font)
             
             painter.translate(option.rect.topLeft() + QPoint(5, 5))
             
             # Custom Selection Highlight
             if option.state & QStyle.StateFlag.State_Selected:
-                 painter.fillRect(QRect(-5, -5, width+10, int(doc.size().height())+10), QColor("#E0E0FF"))
+                 painter.fillRect(QRect(-5, -5, max(option.rect.width(), width+10), int(doc.size().height())+10), QColor("#E0E0FF"))
             
             ctx = QAbstractTextDocumentLayout.PaintContext()
             doc.documentLayout().draw(painter, ctx)
@@ -84,8 +140,7 @@ class HtmlDelegate(QStyledItemDelegate):
 
     def sizeHint(self, option, index):
         if index.column() == 4:
-            doc = QTextDocument()
-            doc.setHtml(index.model()._data[index.row()].get('context_html', ''))
+            html = index.model()._data[index.row()].get('context_html', '')
             
             # Use specific column width from the view if available
             width = option.rect.width()
@@ -93,31 +148,18 @@ class HtmlDelegate(QStyledItemDelegate):
                  width = self.parent().columnWidth(4)
                  
             # Allow some padding in calculation
-            text_width = width - 10
+            text_width = self._bucket(width - 10)
             if text_width <= 50: text_width = 400 # Default fallback
             
-            doc.setTextWidth(text_width)
-            doc.setDefaultFont(option.font)
-            
-            h = int(doc.size().height())
-            return QSize(int(doc.idealWidth()), h + 15) # Add padding
+            key = (html, text_width, option.font.key())
+            hint = self._size_cache.get(key)
+            if hint is None:
+                doc = self._layout_doc(html, text_width, option.font)
+                hint = QSize(int(doc.idealWidth()), int(doc.size().height()) + 15) # Add padding
+                self._size_cache[key] = hint
+                if len(self._size_cache) > self._SIZE_CACHE_SIZE:
+                    self._size_cache.popitem(last=False)
+            else:
+                self._size_cache.move_to_end(key)
+            return QSize(hint)
         return super().sizeHint(option, index)
-
-# ==========================================
-# 0.5 Unicode Helpers
-# ==========================================
-
-def to_qt_pos(full_text: str, py_pos: int) -> int:
-    """Convert Python string index to Qt TextCursor position (UTF-16 code units)."""
-    head = full_text[:py_pos]
-    return len(head.encode('utf-16-le')) // 2
-
-def to_py_pos(full_text: str, qt_pos: int) -> int:
-    """Convert Qt TextCursor position to Python string index."""
-    curr_qt = 0
-    for i, c in enumerate(full_text):
-        if curr_qt >= qt_pos: 
-            return i
-        curr_qt += 2 if ord(c) > 0xFFFF else 1
-    return len(full_text)
-
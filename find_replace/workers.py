@@ -1,10 +1,11 @@
-import difflib
 import hashlib
 import threading
 from collections import OrderedDict
 
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 
+from tools.diff_utils import compute_opcodes
+
 
 def expand_custom_diff_format(format_text, old_segment, new_segment, old_match=None, new_match=None):
     r"""Expand custom diff replacement tokens.
@@ -96,6 +97,7 @@ class ReviewDiffWorker(QThread):
         
         self.is_running = True
         self.items = []
+        self._context_html_pool = {} # 相同的上下文 HTML 只存一份，表格委托缓存按内容命中
         self.cache_hits = 0
 
     @staticmethod
@@ -130,9 +132,7 @@ class ReviewDiffWorker(QThread):
                 cls._opcode_cache.move_to_end(key)
                 return cached, True
 
-        opcodes = tuple(
-            difflib.SequenceMatcher(None, text_a, text_b, autojunk=False).get_opcodes()
-        )
+        opcodes = tuple(compute_opcodes(text_a, text_b))
         with cls._opcode_cache_lock:
             cls._opcode_cache[key] = opcodes
             cls._opcode_cache.move_to_end(key)
@@ -253,6 +253,7 @@ class ReviewDiffWorker(QThread):
                   diff_html = f"{prefix}<span style='{style_del}'>{seg_old_esc}</span>{suffix}"
              elif tag == 'insert':
                   diff_html = f"{prefix}<span style='{style_ins}'>{seg_new_esc}</span>{suffix}"
+             diff_html = self._context_html_pool.setdefault(diff_html, diff_html)
             
              # Line/Col Calculation
              line = text_a.count('\n', 0, i1) + 1
@@ -9,8 +9,6 @@ import uuid
 import zipfile
 from dataclasses import dataclass
 
-import requests
-
 
 PADDLE_ENGINE_ID = "paddleocr"
 LEGACY_PADDLE_ENGINE_ID = "remote"
@@ -39,6 +37,12 @@ TEXT_LABELS = {
 }
 
 
+def http_client():
+    """返回 requests 模块；延迟导入，只有联网时才加载"""
+    import requests
+    return requests
+
+
 def canonical_engine_id(engine_id: str) -> str:
     if engine_id == LEGACY_PADDLE_ENGINE_ID:
         return PADDLE_ENGINE_ID
@@ -76,14 +80,28 @@ def get_legacy_result_paths(save_dir: str, real_page_num: int) -> list[str]:
     ]
 
 
-def discover_ocr_results(save_dir: str, real_page_num: int) -> list[dict]:
-    if not save_dir or not os.path.isdir(save_dir):
+def list_dir_files(path: str) -> frozenset:
+    """Names of regular files directly inside path (empty if it is not a directory)."""
+    try:
+        with os.scandir(path) as it:
+            return frozenset(entry.name for entry in it if entry.is_file())
+    except (OSError, TypeError):
+        return frozenset()
+
+
+def discover_ocr_results(save_dir: str, real_page_num: int, filenames=None) -> list[dict]:
+    """filenames: 可选，save_dir 下文件名集合（由调用方缓存），避免每次翻页都列目录/stat"""
+    if not save_dir:
         return []
+    if filenames is None:
+        if not os.path.isdir(save_dir):
+            return []
+        filenames = list_dir_files(save_dir)
 
     results = []
     seen = set()
     for path in get_legacy_result_paths(save_dir, real_page_num):
-        if os.path.exists(path):
+        if os.path.basename(path) in filenames:
             results.append({
                 "label": "PaddleOCR",
                 "engine_id": PADDLE_ENGINE_ID,
@@ -97,10 +115,8 @@ def discover_ocr_results(save_dir: str, real_page_num: int) -> list[dict]:
         re.compile(rf"^page_{re.escape(str(real_page_num))}_(.+)\.json$", re.I),
         re.compile(rf"^{re.escape(str(real_page_num))}_(.+)\.json$", re.I),
     ]
-    for filename in sorted(os.listdir(save_dir)):
+    for filename in sorted(filenames):
         full_path = os.path.join(save_dir, filename)
-        if not os.path.isfile(full_path):
-            continue
         norm = os.path.normcase(os.path.abspath(full_path))
         if norm in seen:
             continue
@@ -504,6 +520,7 @@ def normalize_chrome_lens(raw, global_config):
 
 
 def run_textin(img_bytes: bytes, config: dict) -> dict:
+    requests = http_client()
     app_id = config.get("app_id", "")
     secret_code = config.get("secret_code", "")
     if not app_id or not secret_code:
@@ -571,6 +588,7 @@ def _compact_error_payload(payload, limit=800):
 
 
 def run_mineru_agent(img_bytes: bytes, config: dict, filename="page.jpg", progress=None) -> dict:
+    requests = http_client()
     token = config.get("token", "")
     if not token:
         raise Exception("MinerU token is not configured.")
@@ -663,6 +681,7 @@ def run_mineru_agent(img_bytes: bytes, config: dict, filename="page.jpg", progre
 
 
 def _download_mineru_zip_result(zip_url, polled_result, config):
+    requests = http_client()
     if not zip_url:
         return polled_result
     zip_resp = requests.get(zip_url, timeout=int(config.get("timeout", 120)))
@@ -681,6 +700,7 @@ def _download_mineru_zip_result(zip_url, polled_result, config):
 
 
 def run_mineru_agent_legacy(img_bytes: bytes, config: dict, filename="page.jpg") -> dict:
+    requests = http_client()
     create_url = config.get("endpoint", "https://mineru.net/api/v1/agent/parse/file")
     payload = {
         "file_name": filename,
@@ -721,6 +741,7 @@ def run_mineru_agent_legacy(img_bytes: bytes, config: dict, filename="page.jpg")
 
 
 def run_quark(img_bytes: bytes, config: dict) -> dict:
+    requests = http_client()
     client_id = config.get("client_id", "")
     client_secret = config.get("client_secret", "")
     if not client_id or not client_secret:
@@ -1,14 +1,34 @@
 import os
 import json
 import difflib
+import threading
+import functools
+from collections import OrderedDict
 import fitz
+from ocr.ocr_engines import list_dir_files
 from PyQt6.QtGui import QImage, QPainter, QColor
 
 IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+# PDF 页面渲染倍率（约 216 DPI），各处共用一个矩阵对象
+RENDER_MATRIX = fitz.Matrix(3.0, 3.0)
 
 
-def get_page_image_path(img_dir, real_page_num):
-    if not img_dir or not os.path.isdir(img_dir):
+@functools.lru_cache(maxsize=4)
+def _image_stem_index(filenames):
+    """{小写主文件名: 文件名}，按目录列表建一次（frozenset 可哈希，按对象命中）"""
+    index = {}
+    for filename in sorted(filenames):
+        stem, ext = os.path.splitext(filename)
+        if ext.lower() in IMAGE_EXTS:
+            index.setdefault(stem.lower(), filename)
+    return index
+
+
+def get_page_image_path(img_dir, real_page_num, filenames=None):
+    """filenames: 可选，img_dir 下文件名集合（由调用方缓存），给出时不再逐个 stat"""
+    if not img_dir:
+        return None
+    if filenames is None and not os.path.isdir(img_dir):
         return None
 
     bases = []
@@ -28,10 +48,23 @@ def get_page_image_path(img_dir, real_page_num):
 
     for base in bases:
         for ext in IMAGE_EXTS:
+            if filenames is not None:
+                if base + ext in filenames:
+                    return os.path.join(img_dir, base + ext)
+                continue
             path = os.path.join(img_dir, base + ext)
             if os.path.exists(path):
                 return path
 
+    if filenames is not None:
+        # 大小写不一致的文件名：查预建的索引，不再逐页扫描整个目录列表
+        index = _image_stem_index(frozenset(filenames))
+        for base in bases:
+            filename = index.get(base.lower())
+            if filename:
+                return os.path.join(img_dir, filename)
+        return None
+
     try:
         wanted = {base.lower() for base in bases}
         for filename in os.listdir(img_dir):
@@ -44,13 +77,16 @@ def get_page_image_path(img_dir, real_page_num):
     return None
 
 
-def get_page_image(doc, img_dir, real_page_num, allow_pdf_render=True):
+def get_page_image(doc, img_dir, real_page_num, allow_pdf_render=True, filenames=None, as_pixmap=False):
     """
     Helper: Extract image bytes from PDF or local directory.
     Priority:
     1. PDF Embedded Image (if single)
     2. PDF Render (High DPI)
     3. Local File (page_X.jpg/png)
+    filenames: optional listing of img_dir (see get_page_image_path)
+    as_pixmap: return the raw fitz.Pixmap of a PDF render instead of PNG bytes
+               (see pixmap_to_qimage); embedded and local images stay encoded
     """
     img_bytes = None
     
@@ -68,14 +104,16 @@ def get_page_image(doc, img_dir, real_page_num, allow_pdf_render=True):
                     img_bytes = base_image["image"]
                 elif allow_pdf_render:
                     # Fallback High DPI Render
-                    pix = page.get_pixmap(matrix=fitz.Matrix(3.0, 3.0))
+                    pix = page.get_pixmap(matrix=RENDER_MATRIX, alpha=False)
+                    if as_pixmap:
+                        return pix
                     img_bytes = pix.tobytes("png")
         except Exception as e:
             pass
             
     # 2. Try Local File
     if not img_bytes and img_dir:
-        found_path = get_page_image_path(img_dir, real_page_num)
+        found_path = get_page_image_path(img_dir, real_page_num, filenames)
             
         if found_path:
              try:
@@ -86,6 +124,55 @@ def get_page_image(doc, img_dir, real_page_num, allow_pdf_render=True):
     return img_bytes
 
 
+def pixmap_to_qimage(pix):
+    """RGB fitz.Pixmap -> QImage without a PNG encode/decode round trip."""
+    # QImage 只引用 samples 缓冲区，copy() 之后 pix 才能释放
+    img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
+    return img.copy()
+
+
+def page_image_to_qimage(img_data):
+    """get_page_image(..., as_pixmap=True) 的结果 -> QImage；无图或解码失败返回 None"""
+    if img_data is None:
+        return None
+    if isinstance(img_data, fitz.Pixmap):
+        img = pixmap_to_qimage(img_data)
+    else:
+        img = QImage()
+        img.loadFromData(img_data)
+    return None if img.isNull() else img
+
+
+def points_to_bbox(pts):
+    """Paddle quad points [[x, y], ...] -> [x1, y1, x2, y2]."""
+    # zip 在 C 层一次完成转置，省去逐点的两次列表推导
+    cols = list(zip(*pts))
+    xs, ys = cols[0], cols[1]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def scale_bbox(bbox, coordinate_type, width, height):
+    """Stored OCR bbox -> [x1, y1, x2, y2] in pixels of a width x height image."""
+    if not bbox or len(bbox) != 4:
+        return None
+    x1, y1, x2, y2 = bbox
+    if width <= 0 or height <= 0:
+        return [x1, y1, x2, y2]
+    # MinerU 为千分比坐标，<=1.5 视为相对坐标
+    if coordinate_type == "mineru_page_1000":
+        return [x1 * width / 1000.0, y1 * height / 1000.0, x2 * width / 1000.0, y2 * height / 1000.0]
+    if max(abs(x1), abs(y1), abs(x2), abs(y2)) <= 1.5:
+        return [x1 * width, y1 * height, x2 * width, y2 * height]
+    return [x1, y1, x2, y2]
+
+
+def has_page_image(doc, img_dir, real_page_num, filenames=None):
+    """Cheap check whether get_page_image can produce an image, without rendering it."""
+    if doc and 0 < real_page_num <= len(doc):
+        return True
+    return bool(img_dir and get_page_image_path(img_dir, real_page_num, filenames))
+
+
 class TextToBBoxMapper:
     def __init__(self, ocr_json_dir, page_offset):
         self.ocr_json_dir = ocr_json_dir
@@ -116,9 +203,7 @@ class TextToBBoxMapper:
                     # Standard Paddle: [[pts, (text, conf)], ...]
                     for item in raw:
                          if len(item) == 2:
-                             pts = item[0]
-                             xs = [p[0] for p in pts]; ys = [p[1] for p in pts]
-                             bbox = [min(xs), min(ys), max(xs), max(ys)]
+                             bbox = points_to_bbox(item[0])
                              txt = item[1][0]
                              data.append({"text": txt, "bbox": bbox, "block_label": "text"})
                 elif isinstance(raw, dict):
@@ -280,6 +365,32 @@ class BBoxMerger:
 
 
 class ImageStitcher:
+    def __init__(self, cache_size=8):
+        # 解码后的整页图片；同一页上的多个框、相邻词条共用一次解码
+        self._pages = OrderedDict()
+        self._lock = threading.Lock() # 同时保护缓存和 fitz 文档（非线程安全）
+        self.cache_size = cache_size
+        self._dir_files = {} # img_dir -> 文件名集合，每次导出只列一次目录
+
+    def _page_image(self, doc, img_dir, real_p):
+        with self._lock:
+            img = self._pages.get(real_p)
+            if img is not None:
+                self._pages.move_to_end(real_p)
+                return img
+            if img_dir and img_dir not in self._dir_files:
+                self._dir_files[img_dir] = list_dir_files(img_dir)
+            img_data = get_page_image(doc, img_dir, real_p, filenames=self._dir_files.get(img_dir), as_pixmap=True)
+        # 转换/解码放在锁外，多个线程可并行
+        img = page_image_to_qimage(img_data)
+        if img is None:
+            return None
+        with self._lock:
+            self._pages[real_p] = img
+            while len(self._pages) > self.cache_size:
+                self._pages.popitem(last=False)
+        return img
+
     def predict_size(self, boxes, is_vertical_text):
         if not boxes: return 0, 0
         
@@ -302,15 +413,10 @@ class ImageStitcher:
             img_qt = None
             
             try:
-                img_bytes = get_page_image(doc, img_dir, real_p)
-                
-                if img_bytes:
-                    full_img = QImage()
-                    full_img.loadFromData(img_bytes)
-                    
-                    if not full_img.isNull():
-                        x, y, w, h = int(b['x']), int(b['y']), int(b['w']), int(b['h'])
-                        img_qt = full_img.copy(x, y, w, h)
+                full_img = self._page_image(doc, img_dir, real_p)
+                if full_img is not None:
+                    x, y, w, h = int(b['x']), int(b['y']), int(b['w']), int(b['h'])
+                    img_qt = full_img.copy(x, y, w, h)
                         
             except Exception as e:
                 pass
@@ -1,21 +1,65 @@
 import os
 import json
-import time
+import hashlib
+import shutil
 import threading
-import requests
+import time
+import random
 import re
 import fitz
 import tempfile
 from importlib import metadata
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from PyQt6.QtCore import QThread, pyqtSignal
-from PyQt6.QtGui import QImageReader
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from PyQt6.QtCore import QThread, QRect, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QImageWriter
 
-from ocr.ocr_utils import get_page_image, TextToBBoxMapper, BBoxMerger, ImageStitcher
+from ocr.ocr_utils import get_page_image, scale_bbox, TextToBBoxMapper, BBoxMerger, ImageStitcher
 
 # v2 API constants
 _V2_JOB_URL = "https://paddleocr.aistudio-app.com/api/v2/ocr/jobs"
 _V2_DEFAULT_MODEL = "PaddleOCR-VL-1.6"
+# 按页面图片内容寻址的识别结果缓存，位于结果目录下
+_RESULT_CACHE_DIR = ".ocr_cache"
+
+# 这些状态码是限流或服务端临时故障，值得重试；其余 4xx 重试也不会成功
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_MAX_RETRY_WAIT = 30.0
+
+
+class RemoteHTTPError(Exception):
+    """Non-2xx response from a remote OCR API; keeps the response for retry decisions."""
+
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+
+def retry_delay(exc, attempt):
+    """Seconds to wait before retrying after exc, or None if retrying is pointless.
+
+    HTTP errors (RemoteHTTPError, requests.HTTPError) are classified by
+    status code and honour Retry-After; anything else keeps the old
+    behaviour of retrying with exponential backoff plus jitter.
+    """
+    response = getattr(exc, "response", None)
+    if response is not None:
+        if response.status_code not in _RETRYABLE_STATUS:
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    wait = None
+            if wait is not None:
+                return min(max(wait, 0.0), 4 * _MAX_RETRY_WAIT)
+    # 1s, 2s, 4s … 加随机抖动，避免并发线程同时重试
+    return min(_MAX_RETRY_WAIT, 2 ** attempt) + random.uniform(0, 0.5)
+
 
 # All supported remote models
 V2_MODELS = [
@@ -33,6 +77,8 @@ from ocr.ocr_engines import (
     PADDLE_ENGINE_ID,
     canonical_engine_id,
     get_result_path,
+    http_client,
+    list_dir_files,
     normalize_ocr_result,
     run_mineru_agent,
     run_quark,
@@ -128,13 +174,19 @@ class OCRWorker(QThread):
         self.engine = canonical_engine_id(engine)
         self.pdf_path = project_config.get('pdf_path')
         self._is_running = True
+        self._stop_event = threading.Event()  # 取消时唤醒重试等待与轮询间隔
         self._executor = None  # ThreadPoolExecutor reference for shutdown
+        self._http = threading.local()  # 每个线程池线程一个 Session，复用连接
+        # 并发线程共用的提交节流：下一次允许提交的时刻
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
 
     # ------------------------------------------------------------------
     # Main thread entry point
     # ------------------------------------------------------------------
     def run(self):
         doc = None
+        doc_lock = threading.Lock()
         if self.pdf_path and os.path.exists(self.pdf_path):
             try:
                 doc = fitz.open(self.pdf_path)
@@ -145,6 +197,11 @@ class OCRWorker(QThread):
         model = self.global_config.get("ocr_api_model", _V2_DEFAULT_MODEL)
         retry_count = int(self.global_config.get("ocr_retry_count", 3))
         concurrent = int(self.global_config.get("ocr_concurrent_tasks", 2))
+        request_interval = float(self.global_config.get("ocr_min_request_interval", 0) or 0)
+
+        # 图片目录只列一次，逐页查找不再对每个候选文件名 stat
+        image_dir = self.project_config.get('image_dir')
+        image_files = list_dir_files(image_dir) if image_dir and os.path.isdir(image_dir) else None
 
         save_dir = self.project_config.get("ocr_json_path", "ocr_results")
         if not os.path.exists(save_dir):
@@ -157,13 +214,14 @@ class OCRWorker(QThread):
         success_count = 0
         # ------ Local engine: simple serial loop ------
         if self.engine == "local":
+            ocr = None # 模型加载很慢：第一次真正需要识别时才创建，整次运行复用
             for i, page_num in enumerate(self.page_list):
                 if not self._is_running:
                     break
                 try:
                     self.progress.emit(f"Processing page {page_num} ({i+1}/{total})...")
                     real_page_num = page_num + self.project_config.get("page_offset", 0)
-                    img_bytes = get_page_image(doc, self.project_config.get('image_dir'), real_page_num)
+                    img_bytes = get_page_image(doc, image_dir, real_page_num, filenames=image_files)
                     if not img_bytes:
                         if self.mode == 'single':
                             raise Exception(f"No image found for page {page_num}")
@@ -172,21 +230,28 @@ class OCRWorker(QThread):
                             self.page_done.emit(i + 1, total)
                             continue
 
+                    json_path = get_result_path(save_dir, real_page_num, self.engine, self.global_config)
+                    cache_path = self._cache_path(save_dir, img_bytes, "PaddleOCR Local")
+                    if self._restore_cached_result(cache_path, json_path):
+                        success_count += 1
+                        self.page_done.emit(i + 1, total)
+                        continue
+
                     if not any(e['id'] == 'local' for e in _ENGINES):
                         raise Exception("Local OCR module not loaded.")
-                    from paddleocr import PaddleOCRVL
+                    if ocr is None:
+                        from paddleocr import PaddleOCRVL
+                        ocr = PaddleOCRVL()
                     temp_path = os.path.join(save_dir, f"temp_{real_page_num}.thumb")
                     with open(temp_path, "wb") as f:
                         f.write(img_bytes)
                     try:
-                        ocr = PaddleOCRVL()
                         res = ocr.predict(temp_path)
                         result = res[0] if res else []
                     finally:
                         if os.path.exists(temp_path):
                             os.remove(temp_path)
 
-                    json_path = get_result_path(save_dir, real_page_num, self.engine, self.global_config)
                     normalized = normalize_ocr_result(result, self.engine, self.global_config)
                     payload = {
                         "__engine": self.engine,
@@ -196,6 +261,7 @@ class OCRWorker(QThread):
                     }
                     with open(json_path, "w", encoding='utf8') as jf:
                         json.dump(payload, jf, ensure_ascii=False, indent=2)
+                    self._store_cached_result(json_path, cache_path)
                     success_count += 1
                     self.page_done.emit(i + 1, total)
 
@@ -209,82 +275,67 @@ class OCRWorker(QThread):
 
         # ------ Remote engine: concurrent with retry ------
         else:
-            # Pre-load all images on the main doc thread (fitz is not thread-safe)
-            page_images = {}  # page_num -> img_bytes
-            skipped_no_image = []
-            for page_num in self.page_list:
-                real_page_num = page_num + self.project_config.get("page_offset", 0)
-                img_bytes = get_page_image(doc, self.project_config.get('image_dir'), real_page_num)
-                if img_bytes:
-                    page_images[page_num] = img_bytes
-                else:
-                    skipped_no_image.append(page_num)
-
-            if skipped_no_image:
-                for page_num in skipped_no_image:
-                    self.progress.emit(f"Page {page_num} skipped: no image")
-                if self.mode == 'single':
-                    self.finished.emit(False, f"No image found for page {skipped_no_image[0]}")
-                    if doc:
-                        doc.close()
-                    return
-
-            if not page_images:
-                if doc:
-                    doc.close()
-                self.finished.emit(False, "No page images found. OCR not submitted.")
-                return
-
+            # 渲染在线程池内与其他页的 OCR 请求重叠进行；fitz 文档不是线程安全的，渲染串行加锁
             counter_lock = threading.Lock()
-            done_count = len(skipped_no_image)
-            if skipped_no_image:
-                self.page_done.emit(done_count, total)
+            done_count = 0
+            skipped_count = 0
 
             def process_page(page_num):
                 """Worker function executed in thread pool."""
                 real_page_num = page_num + self.project_config.get("page_offset", 0)
-                img_bytes = page_images.get(page_num)
+                with doc_lock:
+                    if not self._is_running:
+                        return False, page_num, "cancelled"
+                    img_bytes = get_page_image(doc, image_dir, real_page_num, filenames=image_files)
 
                 if not img_bytes:
                     if self.mode == 'single':
                         raise Exception(f"No image found for page {page_num}")
                     return False, page_num, "no image"
 
+                json_path = get_result_path(save_dir, real_page_num, self.engine, self.global_config)
+                model_tag = model if self.engine == PADDLE_ENGINE_ID else self.engine
+                cache_path = self._cache_path(save_dir, img_bytes, model_tag)
+                if self._restore_cached_result(cache_path, json_path):
+                    return True, page_num, None
+
                 last_exc = None
                 for attempt in range(retry_count):
                     if not self._is_running:
                         return False, page_num, "cancelled"
+                    if self._wait_for_request_slot(request_interval):
+                        return False, page_num, "cancelled"
                     try:
                         result = self._run_engine(img_bytes, token, model, page_num)
-                        json_path = get_result_path(save_dir, real_page_num, self.engine, self.global_config)
                         normalized = normalize_ocr_result(result, self.engine, self.global_config)
                         payload = {
                             "__engine": self.engine,
-                            "__model": model if self.engine == PADDLE_ENGINE_ID else self.engine,
+                            "__model": model_tag,
                             "__normalized_blocks": normalized,
                             "raw": result,
                         }
                         with open(json_path, "w", encoding='utf8') as jf:
                             json.dump(payload, jf, ensure_ascii=False, indent=2)
+                        self._store_cached_result(json_path, cache_path)
                         return True, page_num, None
                     except Exception as e:
                         last_exc = e
+                        wait = retry_delay(e, attempt)
+                        if wait is None:
+                            break # 鉴权失败、参数错误等，重试也不会成功
                         if attempt < retry_count - 1:
-                            wait = 2 ** attempt  # 1s, 2s, 4s …
                             self.progress.emit(
                                 f"Page {page_num}: attempt {attempt+1} failed ({e}), "
-                                f"retrying in {wait}s..."
+                                f"retrying in {wait:.1f}s..."
                             )
                             # Interruptible sleep
-                            for _ in range(wait * 2):
-                                if not self._is_running:
-                                    return False, page_num, "cancelled"
-                                time.sleep(0.5)
+                            if self._stop_event.wait(wait):
+                                return False, page_num, "cancelled"
 
                 return False, page_num, str(last_exc)
 
             # Run concurrent tasks
-            submit_pages = list(page_images.keys())
+            submit_pages = list(self.page_list)
             effective_workers = min(concurrent, len(submit_pages)) if submit_pages else 1
             self._executor = ThreadPoolExecutor(max_workers=effective_workers)
             futures = {
@@ -314,7 +365,10 @@ class OCRWorker(QThread):
                         )
                     else:
                         self.page_done.emit(current_done, total)
-                        if err == "cancelled":
+                        if err == "no image":
+                            skipped_count += 1
+                            self.progress.emit(f"Page {page_num} skipped: no image")
+                        elif err == "cancelled":
                             self.progress.emit(f"Page {page_num} cancelled.")
                         else:
                             self.progress.emit(
@@ -330,10 +384,59 @@ class OCRWorker(QThread):
                 self._executor.shutdown(wait=False)
                 self._executor = None
 
-        if doc:
-            doc.close()
+            if skipped_count == total:
+                with doc_lock:
+                    if doc:
+                        doc.close()
+                self.finished.emit(False, "No page images found. OCR not submitted.")
+                return
+
+        with doc_lock:
+            if doc:
+                doc.close()
         self.finished.emit(True, f"Batch OCR Done. {success_count}/{total} processed.")
 
+    def _wait_for_request_slot(self, interval):
+        """Space request submissions at least interval seconds apart across all
+        pool threads. Returns True if the wait was cancelled."""
+        if interval <= 0:
+            return False
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request_at)
+            self._next_request_at = start + interval
+        delay = start - now
+        return delay > 0 and self._stop_event.wait(delay)
+
+    # ------------------------------------------------------------------
+    # Content-addressed result cache
+    # ------------------------------------------------------------------
+    def _cache_path(self, save_dir, img_bytes, model_tag):
+        """Cache file for this page image under this engine/model."""
+        h = hashlib.blake2b(img_bytes, digest_size=16)
+        h.update(f"\0{self.engine}\0{model_tag}".encode("utf-8"))
+        return os.path.join(save_dir, _RESULT_CACHE_DIR, h.hexdigest() + ".json")
+
+    def _restore_cached_result(self, cache_path, json_path):
+        # 单页识别是用户主动重跑，不走缓存
+        if self.mode == 'single' or not os.path.exists(cache_path):
+            return False
+        try:
+            shutil.copyfile(cache_path, json_path)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _store_cached_result(json_path, cache_path):
+        tmp_path = cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            shutil.copyfile(json_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"OCR cache write failed: {e}")
+
     # ------------------------------------------------------------------
     # v2 Async Job API
     # ------------------------------------------------------------------
@@ -395,8 +498,16 @@ class OCRWorker(QThread):
             raise Exception(f"Chrome Lens OCR failed: {e}")
 
     # ------------------------------------------------------------------
+    def _session(self):
+        """Per-thread requests.Session: keep-alive avoids a TLS handshake per poll."""
+        session = getattr(self._http, "session", None)
+        if session is None:
+            session = self._http.session = http_client().Session()
+        return session
+
     def _run_v2_remote(self, img_bytes: bytes, token: str, model: str, page_num) -> dict:
         """Submit image to PaddleOCR v2 async job API and wait for result."""
+        http = self._session()
         headers = {"Authorization": f"bearer {token}"}
         optional_payload = {
             "useDocOrientationClassify": False,
@@ -412,10 +523,12 @@ class OCRWorker(QThread):
             "optionalPayload": json.dumps(optional_payload),
         }
         files = {"file": (f"page_{page_num}.jpg", img_bytes, "image/jpeg")}
+        # 无超时的请求在断网时会一直挂起，取消也要等它返回
+        timeout = (10, int(paddle_config.get("timeout", 60)))
 
-        job_resp = requests.post(_V2_JOB_URL, headers=headers, data=data, files=files)
+        job_resp = http.post(_V2_JOB_URL, headers=headers, data=data, files=files, timeout=timeout)
         if job_resp.status_code != 200:
-            raise Exception(f"v2 job submit failed ({job_resp.status_code}): {job_resp.text}")
+            raise RemoteHTTPError(f"v2 job submit failed ({job_resp.status_code}): {job_resp.text}", job_resp)
 
         job_id = job_resp.json()["data"]["jobId"]
         self.progress.emit(f"Page {page_num}: job {job_id} submitted, polling...")
@@ -424,9 +537,9 @@ class OCRWorker(QThread):
         poll_headers = {"Authorization": f"bearer {token}"}
         jsonl_url = None
         while self._is_running:
-            poll_resp = requests.get(f"{_V2_JOB_URL}/{job_id}", headers=poll_headers)
+            poll_resp = http.get(f"{_V2_JOB_URL}/{job_id}", headers=poll_headers, timeout=timeout)
             if poll_resp.status_code != 200:
-                raise Exception(f"v2 poll failed ({poll_resp.status_code}): {poll_resp.text}")
+                raise RemoteHTTPError(f"v2 poll failed ({poll_resp.status_code}): {poll_resp.text}", poll_resp)
 
             poll_data = poll_resp.json()["data"]
             state = poll_data["state"]
@@ -447,17 +560,23 @@ class OCRWorker(QThread):
             else:
                 self.progress.emit(f"Page {page_num}: {state}...")
 
-            time.sleep(3)
+            self._stop_event.wait(3)
 
         if not self._is_running:
             raise Exception("OCR job cancelled by user")
 
-        # Download JSONL result
-        jsonl_resp = requests.get(jsonl_url)
-        jsonl_resp.raise_for_status()
+        # Download JSONL result；分块读取，取消时不必等整个结果下载完
+        chunks = []
+        with http.get(jsonl_url, timeout=timeout, stream=True) as jsonl_resp:
+            jsonl_resp.raise_for_status()
+            for chunk in jsonl_resp.iter_content(chunk_size=65536):
+                if not self._is_running:
+                    raise Exception("OCR job cancelled by user")
+                chunks.append(chunk)
+        text = b"".join(chunks).decode("utf-8")
 
         result = None
-        for line in jsonl_resp.text.strip().split('\n'):
+        for line in text.strip().split('\n'):
             line = line.strip()
             if not line:
                 continue
@@ -470,8 +589,11 @@ class OCRWorker(QThread):
     # ------------------------------------------------------------------
     def stop(self):
         self._is_running = False
+        self._stop_event.set()
+        self.requestInterruption()
         if self._executor:
-            self._executor.shutdown(wait=False)
+            # 排队中的页面直接丢弃，正在请求的页面在下一个检查点退出
+            self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 class ImageExportWorker(QThread):
@@ -495,6 +617,8 @@ class ImageExportWorker(QThread):
         self.stitcher = ImageStitcher()
 
     def run(self):
+        doc = None
+        executor = None
         try:
             self.progress.emit("Initializing export...")
 
@@ -502,7 +626,6 @@ class ImageExportWorker(QThread):
             if not os.path.exists(out_img_dir):
                 os.makedirs(out_img_dir)
 
-            doc = None
             pdf_path = self.project_config.get('pdf_path', '')
             if pdf_path and os.path.exists(pdf_path):
                 try:
@@ -511,6 +634,32 @@ class ImageExportWorker(QThread):
                     pass
 
             total = len(self.entries)
+            # 拼图（解码、裁剪、绘制、JPG 编码）都在 Qt 的 C++ 里完成，会释放 GIL，
+            # 放到线程池并行；词条到框的匹配仍在本线程顺序进行
+            workers = min(4, os.cpu_count() or 1)
+            executor = ThreadPoolExecutor(max_workers=workers)
+            pending = {} # {future: (entry, img_filename)}
+
+            def stitch_and_save(merged, is_vertical, save_path):
+                """返回是否写出了图片；写文件失败时抛出异常"""
+                stitched_img = self.stitcher.stitch(
+                    merged, doc, self.project_config.get('image_dir'),
+                    self.project_config.get('page_offset', 0), is_vertical
+                )
+                if not stitched_img:
+                    return False
+                if not stitched_img.save(save_path):
+                    raise Exception(f"Failed to save image {save_path}")
+                return True
+
+            def collect(futures):
+                # 只给真正写出图片的词条记录 image_path；拼图出错则中止导出
+                for future in futures:
+                    entry, img_filename = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    if future.result():
+                        entry['image_path'] = img_filename
 
             for i, entry in enumerate(self.entries):
                 if not self.is_running:
@@ -555,14 +704,18 @@ class ImageExportWorker(QThread):
                             pass
 
                     if should_stitch:
-                        stitched_img = self.stitcher.stitch(
-                            merged, doc, self.project_config.get('image_dir'),
-                            self.project_config.get('page_offset', 0), is_vertical
-                        )
-                        if stitched_img:
-                            stitched_img.save(save_path)
+                        # 限制排队数量，避免拼好的大图堆积在内存里
+                        if len(pending) >= workers * 2:
+                            done, _not_done = wait(pending, return_when=FIRST_COMPLETED)
+                            collect(done)
+                        future = executor.submit(stitch_and_save, merged, is_vertical, save_path)
+                        pending[future] = (entry, img_filename)
+                    else:
+                        entry['image_path'] = img_filename
 
-                    entry['image_path'] = img_filename
+            executor.shutdown(wait=True, cancel_futures=not self.is_running)
+            executor = None
+            collect(list(pending))
 
             self.progress.emit("Saving index file...")
 
@@ -581,15 +734,81 @@ class ImageExportWorker(QThread):
                             f.write(f'<img src="{e["image_path"]}" />\n')
                         f.write("</>\n")
 
-            self.finished.emit(True, f"Export success! Saved to {final_path}")
+            if not self.is_running:
+                self.finished.emit(False, f"Export cancelled. Partial index saved to {final_path}")
+            else:
+                self.finished.emit(True, f"Export success! Saved to {final_path}")
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             self.finished.emit(False, str(e))
         finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
             if doc:
                 doc.close()
 
     def stop(self):
         self.is_running = False
+
+
+class SliceExportWorker(QThread):
+    """Crop every OCR block of one page into its own JPG."""
+    progress_val = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, ocr_data, image, export_dir):
+        super().__init__()
+        self.items = [item for item in ocr_data if isinstance(item, dict) and 'bbox' in item]
+        self.image = image # QImage，只读共享
+        self.export_dir = export_dir
+        self.is_running = True
+
+    @staticmethod
+    def bbox_to_rect(bbox, coordinate_type, width, height):
+        scaled = scale_bbox(bbox, coordinate_type, width, height)
+        if not scaled:
+            return None
+        x1, y1, x2, y2 = scaled
+        rect = QRect(int(x1), int(y1), int(x2 - x1), int(y2 - y1)).intersected(QRect(0, 0, width, height))
+        return rect if not rect.isEmpty() else None
+
+    def run(self):
+        try:
+            # 各块从同一张 QImage 裁剪
+            img = self.image
+            if img is None or img.isNull():
+                self.finished.emit(False, "Could not load image.")
+                return
+            # JPG 不带 alpha：整页先转一次 RGB888，免得每块编码前各自转换
+            if img.format() != QImage.Format.Format_RGB888:
+                img = img.convertToFormat(QImage.Format.Format_RGB888)
+            writer = QImageWriter()
+            writer.setFormat(b"jpg")
+            writer.setQuality(85)
+            count = 0
+            for i, item in enumerate(self.items):
+                if not self.is_running:
+                    break
+                rect = self.bbox_to_rect(item['bbox'], item.get('bbox_coordinate_type'), img.width(), img.height())
+                if rect:
+                    txt = item.get('text', f'slice_{count}')
+                    safe_txt = re.sub(r'[\\/*?:"<>|]', '_', txt)[:30]
+                    path = os.path.join(self.export_dir, f"{safe_txt}.jpg")
+                    writer.setFileName(path)
+                    if writer.write(img.copy(rect)):
+                        count += 1
+                self.progress_val.emit(i + 1)
+
+            if not self.is_running:
+                self.finished.emit(False, f"Canceled after {count} slices.")
+            elif count > 0:
+                self.finished.emit(True, f"Exported {count} slices.")
+            else:
+                self.finished.emit(False, "No bbox slices found.")
+        except Exception as e:
+            self.finished.emit(False, f"Export slice failed: {e}")
+
+    def stop(self):
+        self.is_running = False
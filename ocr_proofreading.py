@@ -3,29 +3,48 @@ import os
 import json
 import re
 import fitz  # PyMuPDF
-import difflib
 import time
+import functools
+import itertools
+import bisect
+import threading
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QTextEdit, QPlainTextEdit, QLabel, QPushButton, QSplitter, QFileDialog,
                              QMessageBox, QGraphicsView, QGraphicsScene,
-                             QGraphicsRectItem, QLineEdit, QSpinBox, QToolBar, QComboBox, QCheckBox,
+                             QGraphicsRectItem, QGraphicsPathItem, QToolTip, QLineEdit, QSpinBox, QToolBar, QComboBox, QCheckBox,
                              QDialog, QListWidget, QStackedWidget)
 from PyQt6.QtGui import (QTextCursor, QColor, QSyntaxHighlighter, QTextCharFormat, QTextFormat,
-                         QAction, QPixmap, QImage, QPainter, QPen, QFont, QTextOption)
+                         QAction, QPixmap, QImage, QPainter, QPainterPath, QPen, QFont, QTextOption)
 from PyQt6.QtWidgets import QProgressBar
 from PyQt6.QtCore import (
-    Qt, QEvent, QSignalBlocker, pyqtSignal, QTimer, QThread, pyqtSlot, QSize, QRect,
+    Qt, QEvent, QSignalBlocker, pyqtSignal, QTimer, QThread, pyqtSlot, QSize, QRect, QRectF,
     QUrl,
 )
-import bisect
+from collections import OrderedDict
+
+# orjson 为可选依赖：大体积 OCR JSON 解析更快，未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# re2 为可选依赖：用户输入的高亮正则用线性时间引擎匹配，避免病态回溯
+try:
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    HAS_RE2 = False
 
 from tools.pdf_tools import SplitPdfDialog, ExportPdfImageDialog
-from tools.text_tools import MergeTextDialog, read_text_to_pages, write_pages_to_file, PAGE_PATTERN
+from tools.text_tools import MergeTextDialog, read_text_to_pages, PageFileWriter
 from tools.furigana import generate_furigana_string, HAS_FURIGANA, HAS_KAKASI
 from tools.project_manager_ui import ProjectManagerDialog
 from tools.export_manager import ExportManager
 from tools.similarity_tools import SimilarityDialog, calculate_page_similarities, text_similarity
+from tools.diff_utils import cached_opcodes, set_opcode_cache_dir
+from tools.unicode_utils import to_qt_pos, to_qt_positions, to_py_pos
 from tools.headword_compare_tools import HeadwordCompareDialog
 from tools.report_review_tools import ReportReviewDialog
 from tools.revision_view import RevisionViewWidget
@@ -47,23 +66,32 @@ from lang.i18n import text_from_config
 # 0.0 Unicode Helpers
 # ==========================================
 
-def to_qt_pos(full_text: str, py_pos: int) -> int:
-    """Convert Python string index to Qt TextCursor position (UTF-16 code units)."""
-    head = full_text[:py_pos]
-    return len(head.encode('utf-16-le')) // 2
+# to_qt_pos / to_py_pos moved to tools.unicode_utils
+
+# OCR 子框层级优先级：越细越优先
+OCR_LEVEL_PRIORITY = {'char': 0, 'word': 1, 'line': 2}
+
+_opcode_ends_cache = [] # [(opcodes, left_ends, right_ends)]，按对象身份命中
 
-def to_py_pos(full_text: str, qt_pos: int) -> int:
-    """Convert Qt TextCursor position to Python string index."""
-    curr_qt = 0
-    for i, c in enumerate(full_text):
-        if curr_qt >= qt_pos:
-            return i
-        curr_qt += 2 if ord(c) > 0xFFFF else 1
-    return len(full_text)
+def _opcode_ends(opcodes):
+    """Per-opcode end positions on each side, computed once per opcode list."""
+    for cached, left_ends, right_ends in _opcode_ends_cache:
+        if cached is opcodes:
+            return left_ends, right_ends
+    left_ends = [op[2] for op in opcodes]
+    right_ends = [op[4] for op in opcodes]
+    # 左右编辑器与 OCR 映射各有一份 opcodes，保留最近几份即可
+    _opcode_ends_cache.insert(0, (opcodes, left_ends, right_ends))
+    del _opcode_ends_cache[4:]
+    return left_ends, right_ends
 
 def map_diff_index(opcodes, index, source_is_left=True):
     """Map a Python character index through SequenceMatcher opcodes."""
-    for tag, i1, i2, j1, j2 in opcodes:
+    # opcodes 在两侧都连续且有序，二分找到第一个结束位置大于 index 的区间
+    left_ends, right_ends = _opcode_ends(opcodes)
+    k = bisect.bisect_right(left_ends if source_is_left else right_ends, index)
+    if k < len(opcodes):
+        tag, i1, i2, j1, j2 = opcodes[k]
         s1, s2 = (i1, i2) if source_is_left else (j1, j2)
         d1, d2 = (j1, j2) if source_is_left else (i1, i2)
         if s1 <= index < s2:
@@ -85,6 +113,177 @@ def map_diff_index(opcodes, index, source_is_left=True):
             return target_end
     return -1
 
+@functools.lru_cache(maxsize=128)
+def compile_regex(pattern: str, flags: int = 0):
+    """Compile a regex once and reuse it; invalid patterns raise re.error."""
+    return re.compile(pattern, flags)
+
+# 用户正则的回溯风险检查：只看 re 解析出的语法树，不做匹配
+try:
+    from re import _parser as _sre_parse, _constants as _sre_c
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_c
+
+_REPEAT_OPS = (_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT)
+_CATEGORY_ESCAPES = {
+    _sre_c.CATEGORY_DIGIT: r"\d", _sre_c.CATEGORY_NOT_DIGIT: r"\D",
+    _sre_c.CATEGORY_SPACE: r"\s", _sre_c.CATEGORY_NOT_SPACE: r"\S",
+    _sre_c.CATEGORY_WORD: r"\w", _sre_c.CATEGORY_NOT_WORD: r"\W",
+}
+_ANY_CHAR = (None, lambda ch: True)
+
+
+def _min_width(state, item):
+    return _sre_parse.SubPattern(state, [item]).getwidth()[0]
+
+
+def _class_matcher(items):
+    """字符类 [...] 的 (字面字符集或 None, 判定函数)"""
+    parts, literals, negate = [], set(), False
+    for op, av in items:
+        if op is _sre_c.NEGATE:
+            negate = True
+        elif op is _sre_c.LITERAL:
+            parts.append(re.escape(chr(av)))
+            literals.add(chr(av))
+        elif op is _sre_c.RANGE:
+            parts.append(f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}")
+            literals = None if literals is None or av[1] - av[0] > 64 else literals | {
+                chr(c) for c in range(av[0], av[1] + 1)}
+        elif op is _sre_c.CATEGORY and av in _CATEGORY_ESCAPES:
+            parts.append(_CATEGORY_ESCAPES[av])
+            literals = None
+        else:
+            return _ANY_CHAR
+    if negate:
+        literals = None
+    regex = re.compile(("[^" if negate else "[") + "".join(parts) + "]")
+    return literals, lambda ch: regex.fullmatch(ch) is not None
+
+
+def _first_chars(pattern):
+    """pattern 开头可能匹配的字符，[(字面字符集或 None, 判定函数), ...]"""
+    firsts = []
+    for item in pattern:
+        op, av = item
+        if op is _sre_c.LITERAL:
+            firsts.append(({chr(av)}, lambda ch, c=chr(av): ch == c))
+        elif op is _sre_c.IN:
+            firsts.append(_class_matcher(av))
+        elif op is _sre_c.SUBPATTERN:
+            firsts += _first_chars(av[-1])
+        elif op is _sre_c.BRANCH:
+            for alt in av[1]:
+                firsts += _first_chars(alt)
+        elif op in _REPEAT_OPS:
+            firsts += _first_chars(av[2])
+        elif op is _sre_c.AT:
+            continue
+        else:
+            firsts.append(_ANY_CHAR)
+        if _min_width(pattern.state, item) > 0:
+            break
+    return firsts
+
+
+def _may_overlap(a, b):
+    for lits_a, match_a in a:
+        for lits_b, match_b in b:
+            if lits_a is not None:
+                if any(match_b(ch) for ch in lits_a):
+                    return True
+            elif lits_b is not None:
+                if any(match_a(ch) for ch in lits_b):
+                    return True
+            else:
+                return True # 两个非字面字符类，保守地视为相交
+    return False
+
+
+def _tail_chars(pattern):
+    """组体末尾长度可变部分能吃进的字符：若与组体开头相交，相邻两次重复的分界就有多种拆法"""
+    tails = []
+    for item in reversed(pattern):
+        op, av = item
+        lo, hi = _sre_parse.SubPattern(pattern.state, [item]).getwidth()
+        if op is _sre_c.SUBPATTERN:
+            tails += _tail_chars(av[-1])
+        elif op is _sre_c.BRANCH:
+            for alt in av[1]:
+                tails += _tail_chars(alt)
+            if lo != hi:
+                tails += _first_chars(_sre_parse.SubPattern(pattern.state, [item]))
+        elif op in _REPEAT_OPS and lo != hi:
+            tails += _first_chars(av[2])
+        if lo > 0:
+            break
+    return tails
+
+
+def _overlapping_branch(pattern):
+    for op, av in pattern:
+        if op is _sre_c.SUBPATTERN and _overlapping_branch(av[-1]):
+            return True
+        if op is _sre_c.BRANCH:
+            firsts = [_first_chars(alt) for alt in av[1]]
+            if any(_may_overlap(firsts[i], firsts[j])
+                   for i in range(len(firsts)) for j in range(i + 1, len(firsts))):
+                return True
+    return False
+
+
+def _has_ambiguous_repeat(pattern):
+    """无界重复的组体可为空、末尾可变部分与开头相交，或含开头相交的分支时返回 True。
+
+    这几种情况 re 会在失败匹配上尝试指数级多的拆分方式，如 (a*)*、(a+)+、
+    (a|aa)+$；(\\d+,)+ 这类以必需分隔符结尾的写法不受影响。
+    """
+    for op, av in pattern:
+        children = ()
+        if op in _REPEAT_OPS:
+            body = av[2]
+            if av[1] == _sre_c.MAXREPEAT and (
+                body.getwidth()[0] == 0
+                or _may_overlap(_tail_chars(body), _first_chars(body))
+                or _overlapping_branch(body)
+            ):
+                return True
+            children = (body,)
+        elif op is _sre_c.SUBPATTERN:
+            children = (av[-1],)
+        elif op is _sre_c.BRANCH:
+            children = av[1]
+        elif op in (_sre_c.ASSERT, _sre_c.ASSERT_NOT):
+            children = (av[1],)
+        if any(_has_ambiguous_repeat(child) for child in children):
+            return True
+    return False
+
+# re2 的 \w \d \s \b 只认 ASCII，而 re 按 Unicode 匹配；前面的反斜杠成对时是转义的字面反斜杠
+_SHORTHAND_CLASS_RE = re.compile(r"(?<!\\)(?:\\\\)*\\[wWdDsSbB]")
+
+@functools.lru_cache(maxsize=128)
+def compile_user_regex(pattern: str):
+    """Compile a user highlight regex with re2 when installed.
+
+    Patterns re2 cannot handle (lookarounds, backreferences) or would match
+    differently (ASCII-only \\w \\d \\s \\b) fall back to re; invalid
+    patterns, and ambiguous repeats that re would backtrack on exponentially,
+    raise re.error.
+    """
+    # 与导出、词头比对用的 re 保持一致：含这些简写时 re2 在中日文文本上会漏匹配
+    if HAS_RE2 and not _SHORTHAND_CLASS_RE.search(pattern):
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass
+    # 高亮在界面线程上逐块匹配，宁可不高亮也不要卡死界面
+    regex = compile_regex(pattern)
+    if _has_ambiguous_repeat(_sre_parse.parse(pattern)):
+        raise re.error("重复的分组存在多种拆分方式，可能回溯过慢，已停用高亮", pattern)
+    return regex
+
 # ==========================================
 # 0.1 Default Configuration
 # ==========================================
@@ -94,6 +293,7 @@ DEFAULT_GLOBAL_CONFIG = {
     "ocr_api_model": "PaddleOCR-VL-1.6",
     "ocr_retry_count": 3,
     "ocr_concurrent_tasks": 2,
+    "ocr_min_request_interval": 0.0, # 远程识别相邻两次提交的最小间隔（秒），0 为不限
     "ocr_engine": "paddleocr",
     "find_history": [],
     "replace_history": [],
@@ -127,9 +327,9 @@ DEFAULT_PROJECT_CONFIG = {
 # 0.1b OCR Utility Imports & Detection
 # ==========================================
 
-from ocr.ocr_utils import get_page_image, get_page_image_path, TextToBBoxMapper, BBoxMerger, ImageStitcher
+from ocr.ocr_utils import get_page_image, has_page_image, page_image_to_qimage, points_to_bbox, scale_bbox, TextToBBoxMapper, BBoxMerger, ImageStitcher
 from ocr.ocr_worker import OCRWorker, ImageExportWorker, get_available_engines, refresh_remote_engine_label, V2_MODELS
-from ocr.ocr_engines import discover_ocr_results, normalize_ocr_result, PADDLE_ENGINE_ID, canonical_engine_id, sort_ocr_results_by_priority
+from ocr.ocr_engines import discover_ocr_results, list_dir_files, normalize_ocr_result, PADDLE_ENGINE_ID, canonical_engine_id, sort_ocr_results_by_priority
 
 
 # ==========================================
@@ -143,15 +343,28 @@ class ConfigManager:
             "projects": [DEFAULT_PROJECT_CONFIG.copy()],
             "active_project": "Default Project"
         }
+        self._by_name = {}
+        # 连续多次修改合并为一次写盘
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(500)
+        self._save_timer.timeout.connect(self.flush)
         self.load()
 
+    def _reindex(self):
+        """重建 项目名 -> 项目 的索引"""
+        self._by_name = {}
+        for p in self.data["projects"]:
+            self._by_name.setdefault(p["name"], p)
+
     def load(self):
         if not os.path.exists(self.filepath):
+            self._reindex()
             return
 
         try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                loaded = json.load(f)
+            with open(self.filepath, "rb") as f:
+                loaded = _json_loads(f.read())
                 
             # Migration Logic: Check if it's flat (old style)
             if "projects" not in loaded:
@@ -189,25 +402,49 @@ class ConfigManager:
                     
         except Exception as e:
             print(f"Config load error: {e}")
+        self._reindex()
 
     def save(self):
+        """延迟 500ms 写盘；退出前需调用 flush_pending()"""
+        self._save_timer.start()
+
+    def flush(self):
+        """立即写盘：先写临时文件再替换，中途崩溃不会留下半截配置"""
+        self._save_timer.stop()
+        tmp_path = self.filepath + ".tmp"
         try:
-            with open(self.filepath, "w", encoding="utf-8") as f:
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(self.data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.filepath)
         except Exception as e:
             print(f"Config save error: {e}")
 
+    def flush_pending(self):
+        """只在还有未落盘的延迟保存时写盘"""
+        if self._save_timer.isActive():
+            self.flush()
+
     def get_global(self):
         return self.data["global"]
 
     def get_projects(self):
         return self.data["projects"]
 
+    def get_project_map(self):
+        return self._by_name
+
     def get_project(self, name):
-        for p in self.data["projects"]:
-            if p["name"] == name:
-                return p
-        return None
+        return self._by_name.get(name)
+
+    def rename_project(self, old_name, new_name):
+        p = self._by_name.get(old_name)
+        if not p or new_name in self._by_name: return False
+        p["name"] = new_name
+        del self._by_name[old_name]
+        self._by_name[new_name] = p
+        if self.data["active_project"] == old_name:
+            self.data["active_project"] = new_name
+        return True
 
     def get_active_project(self):
         name = self.data.get("active_project")
@@ -220,15 +457,16 @@ class ConfigManager:
         return DEFAULT_PROJECT_CONFIG.copy()
 
     def set_active_project(self, name):
-        if self.get_project(name):
+        if name in self._by_name:
             self.data["active_project"] = name
             self.save()
 
     def create_project(self, name):
-        if self.get_project(name): return False
+        if name in self._by_name: return False
         new_p = DEFAULT_PROJECT_CONFIG.copy()
         new_p["name"] = name
         self.data["projects"].append(new_p)
+        self._by_name[name] = new_p
         self.save()
         return True
         
@@ -236,7 +474,8 @@ class ConfigManager:
         # Don't delete if it's the only one
         if len(self.data["projects"]) <= 1: return False
         
-        self.data["projects"] = [p for p in self.data["projects"] if p["name"] != name]
+        if self._by_name.pop(name, None) is not None:
+            self.data["projects"] = [p for p in self.data["projects"] if p["name"] != name]
         
         # Reset active if needed
         if self.data["active_project"] == name:
@@ -256,131 +495,174 @@ class ConfigManager:
 # ==========================================
 
 class DiffSyntaxHighlighter(QSyntaxHighlighter):
+    _shared_fmts = None
+    _fmt_map = None
+
     def __init__(self, document):
         super().__init__(document)
         self.diff_ranges = [] # List of tuples (start, end)
         self.diff_starts = [] # List of start positions for bisect
-        self.diff_ranges = [] # List of tuples (start, end)
-        self.diff_starts = [] # List of start positions for bisect
+        self.diff_ends = [] # 与 diff_starts 平行；区间不重叠，同样有序
+        self._diff_revision = None # 上次 set_diff_data 时的文档版本
         self.regex_pattern = None
         self.regex_group = 0
+        self.regex_error = None # 最近一次 set_regex 未能编译时的原因，供界面提示
+        # 块文本 -> 正则命中区间；整体重绘时未改动的块不必重新匹配，换正则时清空
+        self._regex_spans_cache = OrderedDict()
         
-        # 预定义格式
-        self.diff_fmt = QTextCharFormat()
-        self.diff_fmt.setForeground(QColor("red"))
-        self.diff_fmt.setBackground(QColor("#FFEEEE")) # 浅红背景
+        # 预定义格式：所有高亮器共用同一组格式对象
+        if DiffSyntaxHighlighter._fmt_map is None:
+            DiffSyntaxHighlighter._build_formats()
+        self.diff_fmt, self.regex_fmt, self.both_fmt = self._shared_fmts
         
-        self.regex_fmt = QTextCharFormat()
-        self.regex_fmt.setBackground(QColor("#E0F0FF")) # 浅蓝
-        
-        # Merge Format (Diff FG + Regex BG)
-        self.both_fmt = QTextCharFormat()
-        self.both_fmt.setForeground(QColor("red"))
-        self.both_fmt.setBackground(QColor("#E0F0FF"))
+    @classmethod
+    def _build_formats(cls):
+        diff_fmt = QTextCharFormat()
+        diff_fmt.setForeground(QColor("red"))
+        diff_fmt.setBackground(QColor("#FFEEEE")) # 浅红背景
         
-    def set_diff_data(self, opcodes, is_left):
-        self.diff_ranges = []
-        text = self.document().toPlainText()
+        regex_fmt = QTextCharFormat()
+        regex_fmt.setBackground(QColor("#E0F0FF")) # 浅蓝
         
+        # Merge Format (Diff FG + Regex BG)
+        both_fmt = QTextCharFormat()
+        both_fmt.setForeground(QColor("red"))
+        both_fmt.setBackground(QColor("#E0F0FF"))
+        cls._shared_fmts = (diff_fmt, regex_fmt, both_fmt)
+        # (is_diff, is_regex) -> 格式；默认文本 (False, False) 不在表中，不调用 setFormat
+        cls._fmt_map = {
+            (True, False): diff_fmt,
+            (False, True): regex_fmt,
+            (True, True): both_fmt,
+        }
+
+    def set_diff_data(self, opcodes, is_left, text=None):
+        """text: 文档当前纯文本（调用方已有时传入，省一次 toPlainText）"""
+        old_ranges = self.diff_ranges
+        if text is None:
+            text = self.document().toPlainText()
+
+        # opcodes 按位置递增，端点展开后仍有序，一次归并扫描换算成 Qt 位置
+        bounds = []
         for tag, i1, i2, j1, j2 in opcodes:
             if tag == 'equal': continue
             s_py, e_py = (i1, i2) if is_left else (j1, j2)
             if s_py < e_py:
-                s_qt = to_qt_pos(text, s_py)
-                e_qt = to_qt_pos(text, e_py)
-                self.diff_ranges.append((s_qt, e_qt))
+                bounds.append(s_py)
+                bounds.append(e_py)
+        qt_bounds = to_qt_positions(text, bounds)
+        self.diff_ranges = list(zip(qt_bounds[0::2], qt_bounds[1::2]))
         
         self.diff_ranges.sort() # Ensure sorted
         self.diff_starts = [r[0] for r in self.diff_ranges]
-        self.rehighlight()
+        self.diff_ends = [r[1] for r in self.diff_ranges]
+
+        # 只重绘差异区间发生变化的文本块；文档被编辑过则旧区间的位置已失效，只能整体重绘
+        revision = self.document().revision()
+        stale = revision != self._diff_revision
+        self._diff_revision = revision
+        changed = set(old_ranges).symmetric_difference(self.diff_ranges)
+        if stale or len(changed) > 200:
+            self.rehighlight()
+        elif changed:
+            self.rehighlight_ranges(sorted(changed))
+
+    def rehighlight_ranges(self, ranges):
+        doc = self.document()
+        last_block = -1
+        for s, e in ranges:
+            block = doc.findBlock(s)
+            while block.isValid() and block.position() < e:
+                if block.blockNumber() > last_block:
+                    self.rehighlightBlock(block)
+                    last_block = block.blockNumber()
+                block = block.next()
         
     def set_regex(self, regex_str, group_id=0):
-        if not regex_str:
-            self.regex_pattern = None
-        else:
+        pattern = None
+        self.regex_error = None
+        if regex_str:
             try:
-                self.regex_pattern = re.compile(regex_str)
-            except:
-                self.regex_pattern = None
+                pattern = compile_user_regex(regex_str)
+            except re.error as e:
+                self.regex_error = str(e)
+        if pattern is self.regex_pattern and group_id == self.regex_group:
+            return
+        self.regex_pattern = pattern
         self.regex_group = group_id
+        self._regex_spans_cache.clear()
         self.rehighlight()
 
+    def _regex_spans(self, text):
+        """当前正则在块文本中的命中区间 [(s, e), ...]（最多 101 个），按文本缓存"""
+        spans = self._regex_spans_cache.get(text)
+        if spans is not None:
+            self._regex_spans_cache.move_to_end(text)
+            return spans
+        length = len(text)
+        spans = []
+        for match in itertools.islice(self.regex_pattern.finditer(text), 101):
+            try:
+                s, e = match.start(self.regex_group), match.end(self.regex_group)
+            except IndexError:
+                # Fallback if group not found
+                s, e = match.start(), match.end()
+
+            # Bound checks although finditer on text should be within text
+            s = max(0, s); e = min(length, e)
+            if s < e:
+                spans.append((s, e))
+        self._regex_spans_cache[text] = spans
+        if len(self._regex_spans_cache) > 4096:
+            self._regex_spans_cache.popitem(last=False)
+        return spans
+
     def highlightBlock(self, text):
         length = len(text)
         if length == 0: return
 
-        # Optimization: use boolean array to track states
-        has_diff = [False] * length
-        has_regex = [False] * length
-        
         block_start = self.currentBlock().position()
         block_end = block_start + length
-        
-        # 1. Fill Diff
+
+        # 差异区间与正则区间都按端点记为事件 (位置, 种类, ±1)，扫描一遍即可得到格式分段
+        events = []
+
+        # 1. Diff intervals
         if self.diff_ranges:
-            end_idx = bisect.bisect_right(self.diff_starts, block_end)
-            start_search = bisect.bisect_right(self.diff_starts, block_start)
-            if start_search > 0: start_search -= 1
-            
-            count = 0 
-            for i in range(start_search, end_idx):
-                if count > 1000: break 
-                s, e = self.diff_ranges[i]
-                
-                intersect_start = max(s, block_start)
-                intersect_end = min(e, block_end)
-                
-                if intersect_start < intersect_end:
-                    rel_s = intersect_start - block_start
-                    rel_e = intersect_end - block_start
-                    has_diff[rel_s:rel_e] = [True] * (rel_e - rel_s)
-                count += 1
-        
-        # 2. Fill Regex
+            # 差异区间互不重叠且非空，起点、终点都有序：
+            # 终点 > block_start 且起点 < block_end 的那一段区间都与本块相交
+            lo = bisect.bisect_right(self.diff_ends, block_start)
+            hi = bisect.bisect_left(self.diff_starts, block_end)
+            for s, e in zip(self.diff_starts[lo:hi], self.diff_ends[lo:hi]):
+                events.append((max(s, block_start) - block_start, 0, 1))
+                events.append((min(e, block_end) - block_start, 0, -1))
+
+        # 2. Regex intervals
         if self.regex_pattern:
-            count = 0
-            for match in self.regex_pattern.finditer(text):
-                if count > 100: break 
-                try:
-                    s, e = match.start(self.regex_group), match.end(self.regex_group)
-                except IndexError:
-                    # Fallback if group not found
-                    s, e = match.start(), match.end()
-                    
-                # Bound checks although finditer on text should be within text
-                s = max(0, s); e = min(length, e)
-                if s < e:
-                    has_regex[s:e] = [True] * (e - s)
-                count += 1
-
-        # 3. Apply Formats
-        # Run-Length Encoding approach to minimize setFormat calls
-        current_start = 0
-        current_type = (has_diff[0], has_regex[0]) 
-        
-        for i in range(1, length):
-            new_type = (has_diff[i], has_regex[i])
-            if new_type != current_type:
-                self.apply_format_chunk(current_start, i - current_start, current_type)
-                current_start = i
-                current_type = new_type
-        
-        self.apply_format_chunk(current_start, length - current_start, current_type)
-
-    def apply_format_chunk(self, start, length, flags):
-        is_diff, is_regex = flags
-        if not is_diff and not is_regex: return
-        
-        fmt = None
-        if is_diff and is_regex:
-            fmt = self.both_fmt
-        elif is_diff:
-            fmt = self.diff_fmt
-        elif is_regex:
-            fmt = self.regex_fmt
-            
-        if fmt:
-            self.setFormat(start, length, fmt)
+            for s, e in self._regex_spans(text):
+                events.append((s, 1, 1))
+                events.append((e, 1, -1))
+
+        if not events: return
+        events.sort()
+
+        # 3. Apply Formats: 状态 (diff, regex) 变化时才输出一段，setFormat 次数与区间数同阶
+        fmt_map = self._fmt_map
+        counts = [0, 0]
+        run_start = 0
+        run_state = (False, False)
+        i, n = 0, len(events)
+        while i < n:
+            pos = events[i][0]
+            while i < n and events[i][0] == pos:
+                counts[events[i][1]] += events[i][2]
+                i += 1
+            state = (counts[0] > 0, counts[1] > 0)
+            if state != run_state:
+                fmt = fmt_map.get(run_state)
+                if fmt is not None and pos > run_start:
+                    self.setFormat(run_start, pos - run_start, fmt)
+                run_start, run_state = pos, state
 
 
 class LineNumberArea(QWidget):
@@ -423,7 +705,17 @@ class DiffTextEdit(QPlainTextEdit):
         super().__init__()
         self.side = side # 'left' or 'right'
         self.diff_opcodes = [] # 存储 difflib 的 opcodes
+        # 非 equal 的 opcodes 及其在本侧的起止位置，供按位置二分查找
+        self._diff_ops = []
+        self._diff_op_starts = []
+        self._diff_op_ends = []
         self.other_text_content = "" # 另一侧的完整文本，用于提取
+        self._plain_text = None # toPlainText() 的缓存，文档变化时失效
+        self._hover_memo = None # (光标位置, opcode)：鼠标在同一字符上移动时直接复用
+        self._line_selection_cursor = None # 当前行高亮所用的光标
+        self.document().contentsChanged.connect(self._invalidate_plain_text)
+        self._digit_advance = None # 行号数字宽度，字体变化时重算
+        self._line_number_margin = None
         self.setFont(QFont("Consolas", 11))
         
         # 启用鼠标追踪以支持 Hover
@@ -435,17 +727,34 @@ class DiffTextEdit(QPlainTextEdit):
         self.updateRequest.connect(self.update_line_number_area)
         self.update_line_number_area_width(0)
 
+    def _invalidate_plain_text(self):
+        self._plain_text = None
+        self._hover_memo = None
+
+    def plain_text(self):
+        """toPlainText(), cached until the document changes."""
+        if self._plain_text is None:
+            self._plain_text = self.toPlainText()
+        return self._plain_text
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self._digit_advance = None
+        super().changeEvent(event)
+
     def line_number_area_width(self):
-        digits = 1
-        max_val = max(1, self.blockCount())
-        while max_val >= 10:
-            max_val //= 10
-            digits += 1
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits + 5 # Margin
+        if self._digit_advance is None:
+            self._digit_advance = self.fontMetrics().horizontalAdvance('9')
+        digits = len(str(max(1, self.blockCount())))
+        space = 3 + self._digit_advance * digits + 5 # Margin
         return space
 
     def update_line_number_area_width(self, new_block_count):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        # 整个视口重绘时也会调用；宽度没变就不重设边距（会触发重新布局）
+        width = self.line_number_area_width()
+        if width != self._line_number_margin:
+            self._line_number_margin = width
+            self.setViewportMargins(width, 0, 0, 0)
 
     def update_line_number_area(self, rect, dy):
         if dy:
@@ -470,20 +779,37 @@ class DiffTextEdit(QPlainTextEdit):
         bottom = top + self.blockBoundingRect(block).height()
 
         painter.setPen(Qt.GlobalColor.black)
-        
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
+        # 循环内不变的量只取一次；行高仍逐块取，自动换行时各块高度不同
+        rect_top = event.rect().top()
+        rect_bottom = event.rect().bottom()
+        number_width = self.line_number_area.width() - 3
+        line_height = self.fontMetrics().height()
+        align = Qt.AlignmentFlag.AlignRight
+        
+        while block.isValid() and top <= rect_bottom:
+            if block.isVisible() and bottom >= rect_top:
                 number = str(block_number + 1)
-                painter.drawText(0, int(top), self.line_number_area.width() - 3, self.fontMetrics().height(),
-                                 Qt.AlignmentFlag.AlignRight, number)
+                painter.drawText(0, int(top), number_width, line_height, align, number)
             
             block = block.next()
             top = bottom
             bottom = top + self.blockBoundingRect(block).height()
             block_number += 1
 
+    def _visual_line_key(self, pos):
+        """(块号, 块内排版行号)：FullWidthSelection 高亮的是光标所在的那一个排版行"""
+        block = self.document().findBlock(pos)
+        layout = block.layout()
+        line = layout.lineForTextPosition(pos - block.position()) if layout else None
+        return block.blockNumber(), (line.lineNumber() if line is not None and line.isValid() else -1)
+
     def highlight_line_at_index(self, idx):
         """高亮指定字符索引所在的行"""
+        # 同步滚动/光标联动会反复请求同一行；行没变就不重设 ExtraSelections（会整体重绘视口）
+        # 保存的光标随文档编辑自动移动，始终指向当前高亮的位置
+        current = self._line_selection_cursor
+        if current is not None and self._visual_line_key(current.position()) == self._visual_line_key(idx):
+            return
         self.blockSignals(True)
         
         # 清除之前的 ExtraSelections (除了 Diff 高亮?)
@@ -502,34 +828,41 @@ class DiffTextEdit(QPlainTextEdit):
         selection.cursor.clearSelection() #只是定位
         
         self.setExtraSelections([selection])
+        self._line_selection_cursor = cursor
         
         self.blockSignals(False)
 
     def set_diff_data(self, opcodes, other_text):
         self.diff_opcodes = opcodes
         self.other_text_content = other_text
+        self._diff_ops = [op for op in opcodes if op[0] != 'equal']
+        s, e = (1, 2) if self.side == 'left' else (3, 4)
+        self._diff_op_starts = [op[s] for op in self._diff_ops]
+        self._diff_op_ends = [op[e] for op in self._diff_ops]
+        self._hover_memo = None
 
     def get_opcode_at_position(self, pos):
         """根据鼠标坐标获取对应的 opcode"""
         cursor = self.cursorForPosition(pos)
         qt_idx = cursor.position()
+        memo = self._hover_memo
+        if memo is not None and memo[0] == qt_idx:
+            return memo[1]
         
         # Convert to Python index for opcode lookup
-        text = self.toPlainText()
-        idx = to_py_pos(text, qt_idx)
-        
-        # 遍历 opcodes 查找当前索引是否在差异区间内
-        for tag, i1, i2, j1, j2 in self.diff_opcodes:
-            if tag == 'equal': continue
-            
-            # 判断是在左侧还是右侧
-            if self.side == 'left':
-                if i1 <= idx <= i2:
-                    return (tag, i1, i2, j1, j2)
-            else:
-                if j1 <= idx <= j2:
-                    return (tag, i1, i2, j1, j2)
-        return None
+        idx = to_py_pos(self.plain_text(), qt_idx)
+        
+        # 二分找起点 <= idx 的最后一个差异块，区间两端都算命中
+        opcode = None
+        k = bisect.bisect_right(self._diff_op_starts, idx) - 1
+        if k >= 0 and self._diff_op_ends[k] >= idx:
+            # 相邻差异块首尾相接（或为空区间）时，与原先顺序查找一样取最前面的那个
+            ends = self._diff_op_ends
+            while k > 0 and ends[k - 1] >= idx:
+                k -= 1
+            opcode = tuple(self._diff_ops[k])
+        self._hover_memo = (qt_idx, opcode)
+        return opcode
 
     def mouseMoveEvent(self, event):
         # 检查是否按住 Ctrl
@@ -558,6 +891,7 @@ class DiffTextEdit(QPlainTextEdit):
     def clear_highlight(self):
         """清除高亮（ExtraSelections）"""
         self.setExtraSelections([])
+        self._line_selection_cursor = None
 
     def mousePressEvent(self, event):
         # 处理 Ctrl + Click
@@ -610,7 +944,7 @@ class DiffTextEdit(QPlainTextEdit):
         my_range = (0, 0)
         target_range = (0, 0)
         text_to_push = ""
-        current_text = self.toPlainText()
+        current_text = self.plain_text() # 缓存的全文，切片只复制所需区间
         
         if self.side == 'left':
             my_range = (i1, i2)
@@ -631,6 +965,8 @@ class DiffTextEdit(QPlainTextEdit):
 
 class ImageCanvas(QGraphicsView):
     bbox_clicked = pyqtSignal(int, int)  # OCR 块索引、块内字符偏移
+    # 点击命中多个框时优先级：字 < 词 < 行 < 块(3)
+    _SUB_ITEM_PRIORITY = {'char': 0, 'word': 1, 'line': 2}
     def __init__(self):
         super().__init__()
         self.scene = QGraphicsScene()
@@ -639,6 +975,7 @@ class ImageCanvas(QGraphicsView):
         self.scale_factor = 1.0
         self.bboxes_visible = True
         self.bbox_items = []
+        self.bbox_tooltips = [] # [(x, y, w, h, text)]，按绘制顺序
         self.highlight_items = []
         self.bbox_click_targets = []
         # 拖拽相关
@@ -648,6 +985,7 @@ class ImageCanvas(QGraphicsView):
         self.scene.clear()
         self.highlight_item = None # Fix: Reset C++ object wrapper
         self.bbox_items = []
+        self.bbox_tooltips = []
         self.highlight_items = []
         self.bbox_click_targets = []
         if pixmap:
@@ -659,28 +997,15 @@ class ImageCanvas(QGraphicsView):
         # self.resetTransform()   # Removed to persist zoom
 
     def normalize_bbox_for_scene(self, bbox, coordinate_type=None):
-        if not bbox or len(bbox) != 4:
-            return None
-        x1, y1, x2, y2 = bbox
-        sw = self.sceneRect().width()
-        sh = self.sceneRect().height()
-        if sw <= 0 or sh <= 0:
-            return [x1, y1, x2, y2]
-        if coordinate_type == "mineru_page_1000":
-            return [
-                x1 * sw / 1000.0,
-                y1 * sh / 1000.0,
-                x2 * sw / 1000.0,
-                y2 * sh / 1000.0,
-            ]
-        if max(abs(x1), abs(y1), abs(x2), abs(y2)) <= 1.5:
-            return [x1 * sw, y1 * sh, x2 * sw, y2 * sh]
-        return [x1, y1, x2, y2]
+        rect = self.sceneRect()
+        return scale_bbox(bbox, coordinate_type, rect.width(), rect.height())
         
     def draw_bboxes(self, ocr_data):
         pen = QPen(QColor(255, 0, 0, 200))
         pen.setWidth(3)
         pen.setCosmetic(True)  # 缩放图片时保持固定的屏幕线宽
+        # 所有普通框合成一条路径、一个图元：场景索引和绘制都只处理一个对象
+        path = QPainterPath()
         
         for i, item in enumerate(ocr_data):
             # 兼容 PaddleOCR 格式
@@ -698,25 +1023,17 @@ class ImageCanvas(QGraphicsView):
                 text = item.get('text', '')
             elif isinstance(item, list) and len(item) == 2:
                 # Paddle raw: [[[x1,y1],...], ("text", conf)]
-                pts = item[0]
-                xs = [p[0] for p in pts]
-                ys = [p[1] for p in pts]
-                x, y = min(xs), min(ys)
-                w, h = max(xs)-x, max(ys)-y
+                x, y, x2, y2 = points_to_bbox(item[0])
+                w, h = x2 - x, y2 - y
                 text = item[1][0]
             
-            rect = QGraphicsRectItem(x, y, w, h)
-            rect.setPen(pen)
-            rect.setToolTip(text) # 鼠标悬停显示文字
-            rect.setData(0, i)
-            rect.setVisible(self.bboxes_visible)
-            self.bbox_items.append(rect)
-            self.scene.addItem(rect)
+            path.addRect(QRectF(x, y, w, h))
+            self.bbox_tooltips.append((x, y, w, h, text)) # 鼠标悬停显示文字，见 viewportEvent
 
             area = max(0.0, w) * max(0.0, h)
             self.bbox_click_targets.append((3, area, i, 0, (x, y, w, h)))
             if isinstance(item, dict):
-                priority = {'char': 0, 'word': 1, 'line': 2}
+                priority = self._SUB_ITEM_PRIORITY
                 for sub in item.get('sub_items') or []:
                     sub_bbox = self.normalize_bbox_for_scene(
                         sub.get('bbox'),
@@ -737,6 +1054,28 @@ class ImageCanvas(QGraphicsView):
                         (sx1, sy1, sw, sh),
                     ))
 
+        path_item = QGraphicsPathItem(path)
+        path_item.setPen(pen)
+        path_item.setVisible(self.bboxes_visible)
+        self.bbox_items.append(path_item)
+        self.scene.addItem(path_item)
+
+    def viewportEvent(self, event):
+        # 普通框合并成了一个路径图元，悬停提示按坐标查找；定位框等自带提示的图元优先
+        if event.type() == QEvent.Type.ToolTip and self.bboxes_visible and self.bbox_tooltips:
+            if not any(item.toolTip() for item in self.items(event.pos())):
+                scene_pos = self.mapToScene(event.pos())
+                px, py = scene_pos.x(), scene_pos.y()
+                # 与逐个图元时一致：后绘制的在上层
+                for x, y, w, h, text in reversed(self.bbox_tooltips):
+                    if text and x <= px <= x + w and y <= py <= y + h:
+                        QToolTip.showText(event.globalPos(), text, self.viewport())
+                        return True
+                QToolTip.hideText()
+                event.ignore()
+                return True
+        return super().viewportEvent(event)
+
     def set_bboxes_visible(self, visible):
         """显示或隐藏普通 OCR 框及当前定位框。"""
         self.bboxes_visible = bool(visible)
@@ -748,10 +1087,12 @@ class ImageCanvas(QGraphicsView):
     def mousePressEvent(self, event):
         if (event.modifiers() & Qt.KeyboardModifier.ControlModifier) and (event.button() == Qt.MouseButton.LeftButton):
              scene_pos = self.mapToScene(event.pos())
-             matches = []
-             for priority, area, block_idx, local_offset, (x, y, w, h) in self.bbox_click_targets:
-                 if x <= scene_pos.x() <= x + w and y <= scene_pos.y() <= y + h:
-                     matches.append((priority, area, block_idx, local_offset))
+             px, py = scene_pos.x(), scene_pos.y()
+             matches = [
+                 (priority, area, block_idx, local_offset)
+                 for priority, area, block_idx, local_offset, (x, y, w, h) in self.bbox_click_targets
+                 if x <= px <= x + w and y <= py <= y + h
+             ]
              if matches:
                  _priority, _area, block_idx, local_offset = min(matches)
                  self.bbox_clicked.emit(block_idx, local_offset)
@@ -855,51 +1196,130 @@ class ImageCanvas(QGraphicsView):
 # OCRWorker moved to ocr.ocr_worker
 
 class DiffWorker(QThread):
-    result_ready = pyqtSignal(list, list, list, list)
+    """常驻 diff 线程：只计算最近一次提交的任务，中间提交的旧任务直接丢弃"""
+    result_ready = pyqtSignal(int, list, list, list, list) # (job_id, opcodes, ocr_opcodes, visible_opcodes, errors)
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._job = None
+        self._stopping = False
 
-    def __init__(
-        self, text_l, text_r, ocr_text_full, need_ocr_map,
+    def submit(
+        self, job_id, text_l, text_r, ocr_text_full, need_ocr_map,
         ignore_markup=False, mode_left="plain", mode_right="plain",
     ):
-        super().__init__()
-        self.text_l = text_l
-        self.text_r = text_r
-        self.ocr_text_full = ocr_text_full
-        self.need_ocr_map = need_ocr_map
-        self.ignore_markup = ignore_markup
-        self.mode_left = mode_left
-        self.mode_right = mode_right
-    
+        with self._cond:
+            self._job = (job_id, text_l, text_r, ocr_text_full, need_ocr_map,
+                         ignore_markup, mode_left, mode_right)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
     def run(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                job, self._job = self._job, None
+            job_id, *args = job
+            try:
+                result = self.compute(*args)
+            except Exception as e:
+                print(f"Diff error: {e}")
+                continue
+            self.result_ready.emit(job_id, *result)
+
+    @staticmethod
+    def compute(text_l, text_r, ocr_text_full, need_ocr_map, ignore_markup, mode_left, mode_right):
         # Main Diff
         errors = []
-        if self.ignore_markup:
-            projection_left = build_markup_projection(self.text_l, self.mode_left)
-            projection_right = build_markup_projection(self.text_r, self.mode_right)
-            matcher = difflib.SequenceMatcher(
-                None,
+        if ignore_markup:
+            projection_left = build_markup_projection(text_l, mode_left)
+            projection_right = build_markup_projection(text_r, mode_right)
+            visible_opcodes = cached_opcodes(
                 projection_left.visible_text,
                 projection_right.visible_text,
-                autojunk=False,
             )
-            visible_opcodes = matcher.get_opcodes()
             opcodes = map_projection_opcodes(
                 visible_opcodes, projection_left, projection_right
             )
             errors.extend(f"左侧：{error.display()}" for error in projection_left.errors)
             errors.extend(f"右侧：{error.display()}" for error in projection_right.errors)
         else:
-            matcher = difflib.SequenceMatcher(None, self.text_l, self.text_r, autojunk=False)
-            opcodes = matcher.get_opcodes()
+            opcodes = cached_opcodes(text_l, text_r)
             visible_opcodes = opcodes
         
         # OCR Mapping Diff
         ocr_opcodes = []
-        if self.need_ocr_map and self.ocr_text_full:
-             m2 = difflib.SequenceMatcher(None, self.text_l, self.ocr_text_full, autojunk=False)
-             ocr_opcodes = m2.get_opcodes()
+        if need_ocr_map and ocr_text_full:
+             ocr_opcodes = cached_opcodes(text_l, ocr_text_full)
              
-        self.result_ready.emit(opcodes, ocr_opcodes, visible_opcodes, errors)
+        return opcodes, ocr_opcodes, visible_opcodes, errors
+
+class PageImageWorker(QThread):
+    """常驻页面解码线程：新请求替换尚未开始的旧请求，第一个为当前页，其余为预取页"""
+    image_ready = pyqtSignal(int, int, QImage) # (generation, page_num, image)
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._pages = [] # 待解码的页码，按优先级排列
+        self._source = None # (generation, pdf_path, image_dir, page_offset, image_files)
+        self._current = None # 正在解码的 (generation, page_num)
+        self._stopping = False
+
+    def submit(self, pages, generation, pdf_path, image_dir, page_offset, image_files=None):
+        with self._cond:
+            self._source = (generation, pdf_path, image_dir, page_offset, image_files)
+            # 正在解码的页马上就会送达，不再排队
+            self._pages = [p for p in pages if (generation, p) != self._current]
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
+    def run(self):
+        # MuPDF 文档对象不能跨线程共享，由本线程打开并一直持有；
+        # 项目或配置切换（generation 变化）时才重新打开，文件被替换也能读到新内容
+        doc = None
+        doc_key = None
+        try:
+            while True:
+                with self._cond:
+                    while not self._pages and not self._stopping:
+                        self._cond.wait()
+                    if self._stopping:
+                        return
+                    page_num = self._pages.pop(0)
+                    generation, pdf_path, image_dir, page_offset, image_files = self._source
+                    self._current = (generation, page_num)
+                if (generation, pdf_path) != doc_key:
+                    if doc: doc.close()
+                    doc = None
+                    doc_key = (generation, pdf_path)
+                    if pdf_path and os.path.exists(pdf_path):
+                        try:
+                            doc = fitz.open(pdf_path)
+                        except Exception:
+                            doc = None
+                img = page_image_to_qimage(get_page_image(
+                    doc, image_dir, page_num + page_offset,
+                    filenames=image_files, as_pixmap=True,
+                ))
+                with self._cond:
+                    self._current = None
+                if img is not None:
+                    self.image_ready.emit(generation, page_num, img)
+        finally:
+            if doc: doc.close()
 
 # ==========================================
 # 4. Smart Image Export Helpers
@@ -1185,6 +1605,10 @@ class MainWindow(QMainWindow):
         # self.config = DEFAULT_CONFIG.copy()
         # self.load_config()
         self.config_manager = ConfigManager()
+        # 按内容哈希缓存 diff 结果，重新打开项目时不必重算
+        set_opcode_cache_dir(os.path.join(
+            os.path.dirname(os.path.abspath(self.config_manager.filepath)), ".cache", "diff"
+        ))
         self.global_config = self.config_manager.get_global()
         self.project_config = self.config_manager.get_active_project()
         self.exporter = ExportManager(self)
@@ -1208,6 +1632,11 @@ class MainWindow(QMainWindow):
         self.pages_left = {}  # {page_num: text}
         self.pages_right_text = {} # {page_num: text} (Data Source 2)
         self.current_ocr_data = [] 
+        self._ocr_page_cache = OrderedDict() # {(path, engine, mtime): (ocr_data, (text, char_map, starts, ends))}
+        self._dir_files_cache = {} # {目录: frozenset(文件名)}，翻页时代替逐个 stat
+        self._page_pixmap_cache = OrderedDict() # {page_num: QPixmap}
+        self._page_pixmap_generation = 0
+        self._page_image_worker = None # 常驻 PageImageWorker，首次请求页面图片时启动
         
         self.doc = None # PDF Document
         
@@ -1215,6 +1644,33 @@ class MainWindow(QMainWindow):
         self.dirty_pages_left = set()
         self.dirty_pages_right = {}
         self._is_updating_diff = False # Recursion Guard
+        self.diff_worker = None # 常驻 DiffWorker，首次 diff 时启动
+        self._ocr_rect_memo = (None, None, {}) # (ocr_char_map, 图片尺寸, {ocr_idx: rects})
+        self._ocr_index_memo = (None, None, {}) # (diff_opcodes, ocr_diff_opcodes, {(from_left, idx): ocr_idx})
+        # 文本保存交给后台线程，界面不等待磁盘
+        self.text_writer = PageFileWriter()
+        self.text_writer.saved.connect(self.on_text_saved)
+        self.text_writer.start()
+        self._saving_dirty = {} # {path: [(提交编号, side, 保存前的脏页)]}，写入失败时恢复
+        self._diff_job_id = 0
+        # 输入修改延迟写回内存，合并连续按键
+        self._pending_edit_sides = set()
+        self.edit_flush_timer = QTimer(self)
+        self.edit_flush_timer.setSingleShot(True)
+        self.edit_flush_timer.setInterval(400)
+        self.edit_flush_timer.timeout.connect(self.flush_pending_edits)
+        # 滚动同步合并到每帧一次，只处理最后一次滚动
+        self._pending_scroll = None
+        self.scroll_sync_timer = QTimer(self)
+        self.scroll_sync_timer.setSingleShot(True)
+        self.scroll_sync_timer.setInterval(16)
+        self.scroll_sync_timer.timeout.connect(self._do_sync_scroll)
+        # 光标同步同样合并，按住方向键时不逐次映射
+        self._pending_cursor_editor = None
+        self.cursor_update_timer = QTimer(self)
+        self.cursor_update_timer.setSingleShot(True)
+        self.cursor_update_timer.setInterval(30)
+        self.cursor_update_timer.timeout.connect(self._do_cursor_update)
         
         # Global Undo Stack (for Find/Replace)
         self.global_undo_stack = []
@@ -1241,6 +1697,15 @@ class MainWindow(QMainWindow):
             event.ignore()
             return
         if self.check_unsaved_changes():
+            if self._page_image_worker is not None:
+                self._page_image_worker.stop()
+                self._page_image_worker.wait()
+            if self.diff_worker is not None:
+                self.diff_worker.stop()
+                self.diff_worker.wait()
+            self.text_writer.stop() # 写完排队中的保存再退出
+            self.text_writer.wait()
+            self.config_manager.flush_pending()
             event.accept()
         else:
             event.ignore()
@@ -1480,6 +1945,7 @@ class MainWindow(QMainWindow):
         self.report_review_dialog.activateWindow()
 
     def calculate_page_similarities(self):
+        self.flush_pending_edits()
         return calculate_page_similarities(self.pages_left, self.pages_right_text)
 
     def start_background_progress(self, label):
@@ -1943,24 +2409,25 @@ class MainWindow(QMainWindow):
     def reload_all_data(self):
         # Prevent auto-save of old content into new data
         self.current_loaded_page = None
+        self._pending_edit_sides = set()
         self.last_loaded_source = "Text File B" # Track source for saving
         self.current_ocr_data = None
         self.load_markup_options_from_project()
         # 1. 加载文本
-        self.pages_left = read_text_to_pages(self.project_config['text_path_left'])
+        self.pages_left = self.read_text_pages(self.project_config['text_path_left'])
         self.right_text_candidates = self.get_right_text_candidates()
         self.current_right_candidate_index = min(
             int(self.project_config.get("active_right_text_candidate", 0) or 0),
             max(0, len(self.right_text_candidates) - 1),
         )
-        self.right_candidate_pages = {
-            idx: read_text_to_pages(candidate.get("path", ""))
-            for idx, candidate in enumerate(self.right_text_candidates)
-        }
-        self.pages_right_text = self.right_candidate_pages.get(self.current_right_candidate_index, {})
+        # 其余候选文本在首次切换到时才读取
+        self.right_candidate_pages = {}
+        self.pages_right_text = self.get_right_candidate_pages(self.current_right_candidate_index)
         self.refresh_right_candidate_combo()
         
         # 2. 加载 PDF
+        self._dir_files_cache.clear()
+        self.clear_page_pixmap_cache()
         self.doc = None
         if self.project_config['pdf_path'] and os.path.exists(self.project_config['pdf_path']):
             try:
@@ -1995,6 +2462,20 @@ class MainWindow(QMainWindow):
                 candidates.append({"label": label, "path": path})
         return candidates
 
+    def read_text_pages(self, path):
+        """读取分页文本；若该文件仍在后台保存，先等待写完"""
+        self.text_writer.wait_idle()
+        return read_text_to_pages(path)
+
+    def get_right_candidate_pages(self, idx):
+        """返回候选文本的分页内容，未读取过的候选在此时读取"""
+        pages = self.right_candidate_pages.get(idx)
+        if pages is None:
+            candidates = getattr(self, "right_text_candidates", [])
+            path = candidates[idx].get("path", "") if 0 <= idx < len(candidates) else ""
+            pages = self.right_candidate_pages[idx] = self.read_text_pages(path)
+        return pages
+
     def get_current_right_text_path(self):
         candidates = getattr(self, "right_text_candidates", None) or self.get_right_text_candidates()
         idx = getattr(self, "current_right_candidate_index", 0)
@@ -2069,7 +2550,7 @@ class MainWindow(QMainWindow):
                         return
                 else:
                     path = self.right_text_candidates[old_candidate].get('path', '')
-                    self.right_candidate_pages[old_candidate] = read_text_to_pages(path)
+                    self.right_candidate_pages[old_candidate] = self.read_text_pages(path)
                     self.dirty_pages_right.setdefault(old_candidate, set()).clear()
                     if old_candidate == getattr(self, 'current_right_candidate_index', 0):
                         self.pages_right_text = self.right_candidate_pages[old_candidate]
@@ -2113,7 +2594,7 @@ class MainWindow(QMainWindow):
         self.current_right_candidate_index = idx
         self.project_config["active_right_text_candidate"] = idx
         self.right_text_candidates = self.get_right_text_candidates()
-        self.right_candidate_pages[idx] = read_text_to_pages(path)
+        self.right_candidate_pages[idx] = self.read_text_pages(path)
         self.pages_right_text = self.right_candidate_pages.get(idx, {})
         self.header_right.set_path(path)
         self.config_manager.save()
@@ -2146,7 +2627,11 @@ class MainWindow(QMainWindow):
 
         real_page_num = page_num + self.project_config.get('page_offset', 0)
         results = sort_ocr_results_by_priority(
-            discover_ocr_results(self.project_config.get('ocr_json_path'), real_page_num),
+            discover_ocr_results(
+                self.project_config.get('ocr_json_path'),
+                real_page_num,
+                self.get_dir_files(self.project_config.get('ocr_json_path')),
+            ),
             self.global_config,
         )
 
@@ -2228,67 +2713,25 @@ class MainWindow(QMainWindow):
                 if candidate_idx != getattr(self, "current_right_candidate_index", 0):
                     self.current_right_candidate_index = candidate_idx
                     self.project_config["active_right_text_candidate"] = candidate_idx
-                    self.pages_right_text = self.right_candidate_pages.get(candidate_idx, {})
+                    self.pages_right_text = self.get_right_candidate_pages(candidate_idx)
                     self.header_right.set_path(self.get_current_right_text_path())
                     self.config_manager.save()
             ocr_result_info = current_source_data if isinstance(current_source_data, dict) and current_source_data.get("type") == "ocr" else None
-            ocr_data = self.load_ocr_json(page_num, ocr_result_info)
+            ocr_data, ocr_text_map = self.load_ocr_page(page_num, ocr_result_info)
             self.current_ocr_data = ocr_data # Store for highlighting
             
             # 2. Load Image (High Res). Always refresh the canvas; no image means blank preview.
             ocr_state = " (OCR Done)" if ocr_data else " (No OCR)"
             self.statusBar().showMessage(f"Page {page_num} Loaded{ocr_state}")
 
-            pix = self.get_page_pixmap(page_num)
+            pix = self.request_page_pixmap(page_num)
             if pix:
                 self.image_view.load_content(pix, ocr_data)
             else:
                 self.image_view.load_content(None)
             
             # 3. 构建 OCR 映射 (如果存在)
-            self.ocr_text_full = ""
-            self.ocr_char_map = [] # [(start, end, bbox), ...]
-
-            if ocr_data:
-                current_idx = 0
-                for item in ocr_data:
-                    text, bbox = "", []
-                    sub_items = []
-                    bbox_coordinate_type = None
-                    if isinstance(item, dict):
-                        text = item.get('text', '')
-                        bbox = item.get('bbox', [])
-                        sub_items = item.get('sub_items', [])
-                        bbox_coordinate_type = item.get('bbox_coordinate_type')
-                    elif isinstance(item, list) and len(item) == 2:
-                        text = item[1][0]
-                        # Parse Paddle points to rect
-                        pts = item[0]
-                        xs = [p[0] for p in pts]; ys = [p[1] for p in pts]
-                        bbox = [min(xs), min(ys), max(xs), max(ys)]
-                    
-                    # Append with newline
-                    chunk = text + "\n"
-                    length = len(chunk)
-                    # Map range [current, current+length) -> bbox
-                    # bbox format for map: [x1, y1, x2, y2] usually
-                    # We need x,y,w,h or x1,y1,x2,y2. Let's store [x,y,w,h] for easy use
-                    if len(bbox) == 4:
-                        # Check if it is x1,y1,x2,y2 (Paddle usually points.. but here normalized)
-                        # My load_ocr_json returns [x,y,w,h] for dict? Let's check load_ocr_json
-                        # Wait, load_ocr_json logic for layout parser returns [x,y,x2,y2]??
-                        # Let's standardize bbox in process loop below
-                        pass
-                        
-                    self.ocr_text_full += chunk
-                    self.ocr_char_map.append({
-                        'start_index': current_idx,
-                        'end_index': current_idx + len(text), # exclude newline for click mapping
-                        'bbox': bbox,
-                        'sub_items': sub_items,
-                        'bbox_coordinate_type': bbox_coordinate_type,
-                    })
-                    current_idx += length
+            self.ocr_text_full, self.ocr_char_map, self.ocr_block_starts, self.ocr_block_ends = ocr_text_map
             
             source_data = self.combo_source.currentData()
             is_ocr_mode = isinstance(source_data, dict) and source_data.get("type") == "ocr"
@@ -2367,75 +2810,161 @@ class MainWindow(QMainWindow):
             self._is_loading = False
 
 
-    def get_best_page_image_bytes(self, doc, page_num):
-        """Extract High-Res or Raw image from PDF"""
-        try:
-             real_page_num = page_num + self.project_config.get('page_offset', 0)
-             if 0 < real_page_num <= len(doc):
-                 page = doc[real_page_num - 1]
-                 
-                 # 1. Try Extract Raw Image (scanned PDF)
-                 try:
-                     images = page.get_images()
-                     if len(images) == 1:
-                         xref = images[0][0]
-                         base_image = doc.extract_image(xref)
-                         return base_image["image"]
-                 except: pass # some implementation might fail
-                 
-                 # 2. Fallback: High DPI Render
-                 pix = page.get_pixmap(matrix=fitz.Matrix(3.0, 3.0))
-                 return pix.tobytes("png")
-        except: pass
-        return None
-
     def get_page_pixmap(self, page_num):
-        """Helper for image cropping etc (still needed?) -> Refactor to use get_best..."""
-        if self.doc:
-            b = self.get_best_page_image_bytes(self.doc, page_num)
-            if b:
-                img = QImage.fromData(b)
-                return QPixmap.fromImage(img)
-        img_dir = self.project_config['image_dir']
-        if img_dir and os.path.exists(img_dir):
-            real_page_num = page_num + self.project_config.get('page_offset', 0)
-            image_path = get_page_image_path(img_dir, real_page_num)
-            if image_path:
-                return QPixmap(image_path)
-        return None
+        """同步取页面图片（裁剪导出等），与翻页共用 LRU 缓存"""
+        cached = self._page_pixmap_cache.get(page_num)
+        if cached is not None:
+            self._page_pixmap_cache.move_to_end(page_num)
+            return cached
+        img_dir = self.project_config.get('image_dir')
+        img = page_image_to_qimage(get_page_image(
+            self.doc, img_dir, page_num + self.project_config.get('page_offset', 0),
+            filenames=self.get_dir_files(img_dir), as_pixmap=True,
+        ))
+        if img is None:
+            return None
+        pix = QPixmap.fromImage(img)
+        self.store_page_pixmap(page_num, pix)
+        return pix
+
+    def request_page_pixmap(self, page_num):
+        """返回已缓存的页面图片；未缓存时交给后台线程解码，并预取前后页
+
+        解码顺序即优先级：当前页、下一页、上一页、再下一页（顺序阅读时多预取一页）。
+        """
+        pix = self._page_pixmap_cache.get(page_num)
+        if pix is not None:
+            self._page_pixmap_cache.move_to_end(page_num)
+        pages = [p for p in (page_num, page_num + 1, page_num - 1, page_num + 2)
+                 if p > 0 and p not in self._page_pixmap_cache]
+        if not pages:
+            return pix
+
+        if self._page_image_worker is None:
+            self._page_image_worker = PageImageWorker()
+            self._page_image_worker.image_ready.connect(self.on_page_image_ready)
+            self._page_image_worker.start()
+        self._page_image_worker.submit(
+            pages,
+            self._page_pixmap_generation,
+            self.project_config.get('pdf_path'),
+            self.project_config.get('image_dir'),
+            self.project_config.get('page_offset', 0),
+            self.get_dir_files(self.project_config.get('image_dir')),
+        )
+        return pix
+
+    def on_page_image_ready(self, generation, page_num, img):
+        # 项目或配置已切换，丢弃旧任务的结果
+        if generation != self._page_pixmap_generation:
+            return
+        pix = QPixmap.fromImage(img)
+        self.store_page_pixmap(page_num, pix)
+        if page_num == self.current_loaded_page:
+            self.image_view.load_content(pix, self.current_ocr_data)
+
+    def store_page_pixmap(self, page_num, pix):
+        self._page_pixmap_cache[page_num] = pix
+        self._page_pixmap_cache.move_to_end(page_num)
+        while len(self._page_pixmap_cache) > 8:
+            self._page_pixmap_cache.popitem(last=False)
+
+    def get_dir_files(self, path):
+        """缓存的目录文件名集合；目录不存在时为空集合"""
+        if not path:
+            return frozenset()
+        files = self._dir_files_cache.get(path)
+        if files is None:
+            files = self._dir_files_cache[path] = list_dir_files(path)
+        return files
+
+    def clear_page_pixmap_cache(self):
+        self._page_pixmap_cache.clear()
+        self._page_pixmap_generation += 1
 
     def load_ocr_json(self, page_num, result_info=None):
         """加载 PaddleOCR 格式 JSON"""
+        return self.load_ocr_page(page_num, result_info)[0]
+
+    def build_ocr_text_map(self, ocr_data):
+        """拼接 OCR 全文并记录每个块的字符区间 -> (ocr_text_full, ocr_char_map, block_starts, block_ends)
+
+        block_starts/block_ends 与 ocr_char_map 一一对应，单调递增，供按字符位置二分查块。
+        """
+        texts = []
+        char_map = [] # [{'start_index', 'end_index', 'bbox', ...}, ...]
+        current_idx = 0
+        for item in ocr_data:
+            text, bbox = "", []
+            sub_items = []
+            bbox_coordinate_type = None
+            if isinstance(item, dict):
+                text = item.get('text', '')
+                bbox = item.get('bbox', [])
+                sub_items = item.get('sub_items', [])
+                bbox_coordinate_type = item.get('bbox_coordinate_type')
+            elif isinstance(item, list) and len(item) == 2:
+                text = item[1][0]
+                # Parse Paddle points to rect
+                bbox = points_to_bbox(item[0])
+
+            texts.append(text)
+            char_map.append({
+                'start_index': current_idx,
+                'end_index': current_idx + len(text), # exclude newline for click mapping
+                'bbox': bbox,
+                # 按层级预先排好序，光标移动时不再逐次排序
+                'sub_items': sorted(
+                    sub_items or [],
+                    key=lambda sub: OCR_LEVEL_PRIORITY.get(sub.get('level'), 3),
+                ),
+                'bbox_coordinate_type': bbox_coordinate_type,
+            })
+            current_idx += len(text) + 1 # Append with newline
+        text_full = "\n".join(texts) + "\n" if texts else ""
+        block_starts = [m['start_index'] for m in char_map]
+        block_ends = [m['end_index'] for m in char_map]
+        return text_full, char_map, block_starts, block_ends
+
+    def load_ocr_page(self, page_num, result_info=None):
+        """加载 OCR 结果及其文本映射，按 (文件, 修改时间) 缓存 -> (ocr_data, (text, char_map, starts, ends))"""
         if result_info and result_info.get("path"):
             f_path = result_info["path"]
             engine_id = result_info.get("engine_id", PADDLE_ENGINE_ID)
         else:
             path = self.project_config['ocr_json_path']
             real_page_num = page_num + self.project_config.get('page_offset', 0)
-            discovered = sort_ocr_results_by_priority(discover_ocr_results(path, real_page_num), self.global_config)
-            if discovered:
-                result_info = discovered[0]
-                f_path = result_info["path"]
-                engine_id = result_info.get("engine_id", PADDLE_ENGINE_ID)
-            else:
-                f_path = os.path.join(path, f"page_{real_page_num}.json")
-                engine_id = PADDLE_ENGINE_ID
-                if not os.path.exists(f_path):
-                    # 尝试直接数字
-                    f_path = os.path.join(path, f"{real_page_num}.json")
-        
+            files = self.get_dir_files(path)
+            discovered = sort_ocr_results_by_priority(discover_ocr_results(path, real_page_num, files), self.global_config)
+            if not discovered:
+                # 旧格式 page_N.json / N.json 已由 discover_ocr_results 覆盖，目录中没有该页结果
+                return [], ("", [], [], [])
+            result_info = discovered[0]
+            f_path = result_info["path"]
+            engine_id = result_info.get("engine_id", PADDLE_ENGINE_ID)
+
         if os.path.exists(f_path):
             try:
-                with open(f_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 简单适配逻辑：
-                    # 如果是标准 Paddle list: [[points, (text, conf)], ...]
-                    # 如果是 layout parser: data['fullContent']... (需要解析)
-                    
-                    return normalize_ocr_result(data, engine_id, self.global_config)
+                cache_key = (f_path, engine_id, os.path.getmtime(f_path))
+                cached = self._ocr_page_cache.get(cache_key)
+                if cached is not None:
+                    self._ocr_page_cache.move_to_end(cache_key)
+                    return cached
+                with open(f_path, 'rb') as f:
+                    data = _json_loads(f.read())
+                # 简单适配逻辑：
+                # 如果是标准 Paddle list: [[points, (text, conf)], ...]
+                # 如果是 layout parser: data['fullContent']... (需要解析)
+
+                ocr_data = normalize_ocr_result(data, engine_id, self.global_config)
+                result = (ocr_data, self.build_ocr_text_map(ocr_data))
+                self._ocr_page_cache[cache_key] = result
+                while len(self._ocr_page_cache) > 32:
+                    self._ocr_page_cache.popitem(last=False)
+                return result
             except Exception as e:
                 print(f"JSON Load error: {e}")
-        return []
+        return [], ("", [], [], [])
 
     # ================= Diff 核心 =================
 
@@ -2564,7 +3093,7 @@ class MainWindow(QMainWindow):
             preview.toPlainText(), preview.textCursor().position()
         )
         source_py = projection.map_position(rendered_py)
-        source_qt = to_qt_pos(source_editor.toPlainText(), source_py)
+        source_qt = to_qt_pos(source_editor.plain_text(), source_py)
         source_editor.highlight_line_at_index(source_qt)
         self.request_highlight_other(source_editor, source_qt)
         self.check_auto_scroll_bbox(source_editor, source_qt)
@@ -2579,7 +3108,7 @@ class MainWindow(QMainWindow):
         if not pattern:
             return []
         try:
-            regex = re.compile(pattern)
+            regex = compile_user_regex(pattern)
         except re.error:
             return []
         ranges = []
@@ -2793,7 +3322,7 @@ class MainWindow(QMainWindow):
         if page_num != current_page:
             return
         editor = self.edit_left if side == "left" else self.edit_right
-        qt_position = to_qt_pos(editor.toPlainText(), py_position)
+        qt_position = to_qt_pos(editor.plain_text(), py_position)
         cursor = editor.textCursor()
         cursor.setPosition(min(qt_position, editor.document().characterCount() - 1))
         editor.setTextCursor(cursor)
@@ -2807,8 +3336,7 @@ class MainWindow(QMainWindow):
             self.ocr_diff_opcodes = []
             return
             
-        matcher = difflib.SequenceMatcher(None, left_text, self.ocr_text_full, autojunk=False)
-        self.ocr_diff_opcodes = matcher.get_opcodes()
+        self.ocr_diff_opcodes = cached_opcodes(left_text, self.ocr_text_full)
 
     def init_diff_timer(self):
         self.diff_timer = QTimer(self)
@@ -2832,27 +3360,56 @@ class MainWindow(QMainWindow):
         text_r = self.edit_right.toPlainText()
         
         need_ocr_map = (self.is_text_source_selected() and bool(self.ocr_text_full))
-        
-        self.diff_worker = DiffWorker(
+        ignore_markup = self.chk_ignore_markup.isChecked()
+        mode_left = self.markup_mode("left")
+        mode_right = self.markup_mode("right")
+
+        # 输入未变化时直接复用上次结果，不再启动线程重新计算
+        diff_key = (
+            text_l, text_r, self.ocr_text_full if need_ocr_map else "",
+            need_ocr_map, ignore_markup, mode_left, mode_right,
+        )
+        if diff_key == getattr(self, "_last_diff_key", None):
+            self._diff_job_id += 1 # 作废仍在计算的旧任务
+            try:
+                self.on_diff_finished(*self._last_diff_result)
+            finally:
+                self._is_updating_diff = False
+            return
+        # 计算期间不阻塞输入；线程只保留最新任务，过期结果在 on_diff_result_ready 丢弃
+        self._is_updating_diff = False
+        self._diff_job_id += 1
+        self._pending_diff_key = diff_key
+
+        if self.diff_worker is None:
+            self.diff_worker = DiffWorker()
+            self.diff_worker.result_ready.connect(self.on_diff_result_ready)
+            self.diff_worker.start()
+        self.diff_worker.submit(
+            self._diff_job_id,
             text_l,
             text_r,
             self.ocr_text_full,
             need_ocr_map,
-            ignore_markup=self.chk_ignore_markup.isChecked(),
-            mode_left=self.markup_mode("left"),
-            mode_right=self.markup_mode("right"),
+            ignore_markup=ignore_markup,
+            mode_left=mode_left,
+            mode_right=mode_right,
         )
-        self.diff_worker.result_ready.connect(self.on_diff_finished)
-        self.diff_worker.finished.connect(self.on_diff_thread_finished)
-        self.diff_worker.start()
 
-    def on_diff_thread_finished(self):
-        self._is_updating_diff = False
-        self.diff_worker = None
+    def on_diff_result_ready(self, job_id, opcodes, ocr_opcodes, visible_opcodes, markup_errors):
+        if job_id != self._diff_job_id:
+            return
+        self._last_diff_key = self._pending_diff_key
+        self._last_diff_result = (opcodes, ocr_opcodes, visible_opcodes, markup_errors)
+        self._is_updating_diff = True
+        try:
+            self.on_diff_finished(opcodes, ocr_opcodes, visible_opcodes, markup_errors)
+        finally:
+            self._is_updating_diff = False
 
     def on_diff_finished(self, opcodes, ocr_opcodes, visible_opcodes, markup_errors):
-        text_l = self.edit_left.toPlainText()
-        text_r = self.edit_right.toPlainText()
+        text_l = self.edit_left.plain_text()
+        text_r = self.edit_right.plain_text()
         
         # Set Data
         self.edit_left.set_diff_data(opcodes, text_r)
@@ -2861,16 +3418,8 @@ class MainWindow(QMainWindow):
         # Highlight
         left_blocker = QSignalBlocker(self.edit_left)
         right_blocker = QSignalBlocker(self.edit_right)
-        self.highlighter_left.set_diff_data(opcodes, is_left=True)
-        self.highlighter_right.set_diff_data(opcodes, is_left=False)
-        self.highlighter_left.set_regex(
-            self.project_config.get("regex_left"),
-            self.project_config.get("regex_group_left", 0),
-        )
-        self.highlighter_right.set_regex(
-            self.project_config.get("regex_right"),
-            self.project_config.get("regex_group_right", 0),
-        )
+        self.highlighter_left.set_diff_data(opcodes, is_left=True, text=text_l)
+        self.highlighter_right.set_diff_data(opcodes, is_left=False, text=text_r)
         del right_blocker
         del left_blocker
         self._highlight_markup_previews(opcodes)
@@ -2922,6 +3471,7 @@ class MainWindow(QMainWindow):
         """
         检查未保存 (Exit Only). 如果有，弹窗提示。
         """
+        self.flush_pending_edits()
         if self.dirty_pages_left or self.has_dirty_right_pages():
             msg = "Unsaved changes in:\n"
             if self.dirty_pages_left: msg += "- Left Text\n"
@@ -2954,6 +3504,19 @@ class MainWindow(QMainWindow):
         else:
             self.current_right_dirty_pages().add(p)
             
+    def flush_pending_edits(self):
+        """把输入期间累积的修改写回内存并标记脏页（按键时只记录，不复制全文）"""
+        self.edit_flush_timer.stop()
+        sides = self._pending_edit_sides
+        if not sides or self.current_loaded_page is None: return
+        self._pending_edit_sides = set()
+        p = self.current_loaded_page
+        if "left" in sides:
+            self.dirty_pages_left.add(p)
+        if "right" in sides:
+            self.current_right_dirty_pages().add(p)
+        self.update_memory_cache()
+
     def update_memory_cache(self):
         """Update memory dicts from editors"""
         try:
@@ -2968,11 +3531,8 @@ class MainWindow(QMainWindow):
         if self._is_loading: return
         self.last_manual_edit_time = time.time()
         if not self._is_updating_diff:
-            try:
-                p = int(self.spin_page.text())
-                self.dirty_pages_left.add(p)
-            except: pass
-            self.update_memory_cache()
+            self._pending_edit_sides.add("left")
+            self.edit_flush_timer.start()
         if not getattr(self, "_updating_markup_preview", False):
             self.refresh_markup_views("left")
         self.deferred_run_diff()
@@ -2981,11 +3541,8 @@ class MainWindow(QMainWindow):
         if self._is_loading: return
         self.last_manual_edit_time = time.time()
         if not self._is_updating_diff:
-            try:
-                p = int(self.spin_page.text())
-                self.current_right_dirty_pages().add(p)
-            except: pass
-            self.update_memory_cache()
+            self._pending_edit_sides.add("right")
+            self.edit_flush_timer.start()
         if not getattr(self, "_updating_markup_preview", False):
             self.refresh_markup_views("right")
         self.deferred_run_diff()
@@ -3014,6 +3571,14 @@ class MainWindow(QMainWindow):
         )
         del right_blocker
         del left_blocker
+        # 无效或被拒绝（嵌套量词）的正则不会高亮，告诉用户原因
+        errors = [
+            f"{label}：{hl.regex_error}"
+            for label, hl in (("左侧", self.highlighter_left), ("右侧", self.highlighter_right))
+            if hl.regex_error
+        ]
+        if errors:
+            self.statusBar().showMessage("正则未生效，" + "；".join(errors), 7000)
 
     def on_zoom_request(self, delta):
         """Synchronized Font Zoom (Ctrl+Wheel)"""
@@ -3057,7 +3622,7 @@ class MainWindow(QMainWindow):
         """获取索引映射 (Qt Index -> Qt Index)"""
         # 1. Convert Src Qt -> Src Py
         src_editor = self.edit_left if is_left_source else self.edit_right
-        src_text = src_editor.toPlainText()
+        src_text = src_editor.plain_text()
         py_idx = to_py_pos(src_text, qt_idx)
         
         opcodes = self.edit_left.diff_opcodes
@@ -3067,11 +3632,12 @@ class MainWindow(QMainWindow):
         
         # 2. Convert Dst Py -> Dst Qt
         dst_editor = self.edit_right if is_left_source else self.edit_left
-        dst_text = dst_editor.toPlainText()
+        dst_text = dst_editor.plain_text()
         return to_qt_pos(dst_text, mapped_py_idx)
 
     def save_current_page_data(self):
         """Explicitly save editor content to memory dicts if changed"""
+        self.flush_pending_edits()
         if self.current_loaded_page is None: return
         p = self.current_loaded_page
         
@@ -3085,7 +3651,7 @@ class MainWindow(QMainWindow):
         # Right (Check Last Loaded Source!)
         if hasattr(self, 'last_loaded_source') and self.last_loaded_source == "Text File B":
             candidate_idx = getattr(self, "last_loaded_right_candidate_index", getattr(self, "current_right_candidate_index", 0))
-            pages = self.right_candidate_pages.setdefault(candidate_idx, {})
+            pages = self.get_right_candidate_pages(candidate_idx)
             current_right = self.edit_right.toPlainText()
             saved_right = pages.get(p, "")
             if current_right != saved_right:
@@ -3108,8 +3674,15 @@ class MainWindow(QMainWindow):
         if self._is_program_scrolling: return
         # Don't sync scroll if we are actively syncing cursor (which handles its own visibility)
         if hasattr(self, '_is_syncing_cursor') and self._is_syncing_cursor: return
+        self._pending_scroll = (source, target)
+        self.scroll_sync_timer.start()
+
+    def _do_sync_scroll(self):
+        if not self._pending_scroll: return
+        source, target = self._pending_scroll
+        self._pending_scroll = None
         if not source.isVisible() or not target.isVisible(): return
-        
+
         self._is_program_scrolling = True
         try:
             s_bar = source.verticalScrollBar()
@@ -3162,37 +3735,59 @@ class MainWindow(QMainWindow):
         # 如果是 Left Editor (或者 Right Editor 非 OCR 模式)
         # 使用 Diff Mapping 映射到 OCR Index
         
-        target_ocr_idx = -1
-        
         # 1. 先统一映射到左侧文本索引，再由左侧映射到 OCR 索引。
-        src_py_idx = to_py_pos(editor.toPlainText(), idx)
-        left_py_idx = src_py_idx
-        if editor == self.edit_right:
-            left_py_idx = map_diff_index(
-                getattr(self.edit_left, 'diff_opcodes', []),
-                src_py_idx,
-                source_is_left=False,
-            )
-
-        if left_py_idx >= 0:
-            target_ocr_idx = map_diff_index(
-                getattr(self, 'ocr_diff_opcodes', []),
-                left_py_idx,
-                source_is_left=True,
-            )
+        src_py_idx = to_py_pos(editor.plain_text(), idx)
+        target_ocr_idx = self.map_index_to_ocr(src_py_idx, editor == self.edit_left)
         
         # 2. Find BBox for target_ocr_idx
         if target_ocr_idx >= 0:
-            entries = self.find_ocr_bbox_entries_for_index(target_ocr_idx)
-            if entries:
-                self.image_view.set_highlight_bboxes(
-                    [(x1, y1, x2 - x1, y2 - y1, level) for level, (x1, y1, x2, y2) in entries]
-                )
+            rects = self.find_ocr_highlight_rects(target_ocr_idx)
+            if rects:
+                self.image_view.set_highlight_bboxes(rects)
                 return
 
+    def map_index_to_ocr(self, src_py_idx, from_left):
+        """编辑器 Python 下标 -> OCR 全文下标（经左侧文本中转），结果按当前 opcodes 缓存"""
+        diff_ops = getattr(self.edit_left, 'diff_opcodes', [])
+        ocr_ops = getattr(self, 'ocr_diff_opcodes', [])
+        memo_diff_ops, memo_ocr_ops, memo = self._ocr_index_memo
+        if memo_diff_ops is not diff_ops or memo_ocr_ops is not ocr_ops or len(memo) > 256:
+            memo = {}
+            self._ocr_index_memo = (diff_ops, ocr_ops, memo)
+        key = (from_left, src_py_idx)
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+
+        left_py_idx = src_py_idx
+        if not from_left:
+            left_py_idx = map_diff_index(diff_ops, src_py_idx, source_is_left=False)
+        target_ocr_idx = -1
+        if left_py_idx >= 0:
+            target_ocr_idx = map_diff_index(ocr_ops, left_py_idx, source_is_left=True)
+        memo[key] = target_ocr_idx
+        return target_ocr_idx
+
     def normalize_display_bbox(self, bbox, coordinate_type=None):
         return self.image_view.normalize_bbox_for_scene(bbox, coordinate_type)
 
+    def find_ocr_highlight_rects(self, ocr_idx):
+        """OCR 下标 -> 图片视图坐标下的 [(x, y, w, h, level)]，按当前页和图片尺寸缓存"""
+        if not hasattr(self, 'ocr_char_map'):
+            return []
+        scene_size = (self.image_view.sceneRect().width(), self.image_view.sceneRect().height())
+        memo_map, memo_size, memo = self._ocr_rect_memo
+        if memo_map is not self.ocr_char_map or memo_size != scene_size or len(memo) > 512:
+            memo = {}
+            self._ocr_rect_memo = (self.ocr_char_map, scene_size, memo)
+        rects = memo.get(ocr_idx)
+        if rects is None:
+            rects = memo[ocr_idx] = [
+                (x1, y1, x2 - x1, y2 - y1, level)
+                for level, (x1, y1, x2, y2) in self.find_ocr_bbox_entries_for_index(ocr_idx)
+            ]
+        return rects
+
     def find_ocr_bbox_for_index(self, ocr_idx):
         bboxes = self.find_ocr_bboxes_for_index(ocr_idx)
         return bboxes[0] if bboxes else None
@@ -3203,72 +3798,69 @@ class MainWindow(QMainWindow):
     def find_ocr_bbox_entries_for_index(self, ocr_idx):
         if not hasattr(self, 'ocr_char_map'):
             return []
-        for mapping in self.ocr_char_map:
+        # 第一个满足 start <= ocr_idx <= end + 1 的块（块区间单调递增）
+        k = bisect.bisect_left(self.ocr_block_ends, ocr_idx - 1)
+        if k < len(self.ocr_char_map) and self.ocr_block_starts[k] <= ocr_idx:
+            mapping = self.ocr_char_map[k]
             start = mapping.get('start_index', 0)
             end = mapping.get('end_index', 0)
-            if start <= ocr_idx <= end + 1:
-                local_idx = max(0, min(ocr_idx - start, max(0, end - start)))
-                # 同一字符可能同时落在 line/word/char 中，优先使用最细粒度。
-                priority = {'char': 0, 'word': 1, 'line': 2}
-                sub_items = sorted(
-                    mapping.get('sub_items') or [],
-                    key=lambda sub: priority.get(sub.get('level'), 3),
-                )
-                matches = []
-                for sub in sub_items:
-                    sub_start = sub.get('start', 0)
-                    sub_end = sub.get('end', sub_start)
-                    if sub_start <= local_idx < sub_end:
-                        bbox = self.normalize_display_bbox(
-                            sub.get('bbox'),
-                            sub.get('bbox_coordinate_type') or mapping.get('bbox_coordinate_type'),
-                        )
-                        if bbox:
-                            level = sub.get('level') or 'block'
-                            matches.append((priority.get(level, 3), level, bbox))
-                if matches:
-                    # 最细框用于滚动定位，同时保留 word/line 等所属层级框。
-                    return [(level, bbox) for _priority, level, bbox in sorted(matches, key=lambda item: item[0])]
-                block_bbox = self.normalize_display_bbox(mapping.get('bbox'), mapping.get('bbox_coordinate_type'))
-                return [('block', block_bbox)] if block_bbox else []
+            local_idx = max(0, min(ocr_idx - start, max(0, end - start)))
+            # 同一字符可能同时落在 line/word/char 中，优先使用最细粒度。
+            # sub_items 已在 build_ocr_text_map 中按层级排序。
+            matches = []
+            for sub in mapping.get('sub_items') or []:
+                sub_start = sub.get('start', 0)
+                sub_end = sub.get('end', sub_start)
+                if sub_start <= local_idx < sub_end:
+                    bbox = self.normalize_display_bbox(
+                        sub.get('bbox'),
+                        sub.get('bbox_coordinate_type') or mapping.get('bbox_coordinate_type'),
+                    )
+                    if bbox:
+                        matches.append((sub.get('level') or 'block', bbox))
+            if matches:
+                # 最细框用于滚动定位，同时保留 word/line 等所属层级框。
+                return matches
+            block_bbox = self.normalize_display_bbox(mapping.get('bbox'), mapping.get('bbox_coordinate_type'))
+            return [('block', block_bbox)] if block_bbox else []
         return []
 
     def _handle_right_editor_ocr_scroll(self, editor, idx):
         # New Logic: Char based mapping using to_py_pos and ocr_char_map
-        text = editor.toPlainText()
+        text = editor.plain_text()
         py_idx = to_py_pos(text, idx)
         
         if not hasattr(self, 'ocr_char_map'): return
         
-        entries = self.find_ocr_bbox_entries_for_index(py_idx)
-        if entries:
-            self.image_view.set_highlight_bboxes(
-                [(x1, y1, x2 - x1, y2 - y1, level) for level, (x1, y1, x2, y2) in entries]
-            )
+        rects = self.find_ocr_highlight_rects(py_idx)
+        if rects:
+            self.image_view.set_highlight_bboxes(rects)
             return
 
     def on_cursor_left(self):
-        if self._is_syncing_cursor: return
-        self._is_syncing_cursor = True
-        try:
-            idx = self.edit_left.textCursor().position()
-            self.edit_left.highlight_line_at_index(idx)
-            self.request_highlight_other(self.edit_left, idx)
-            # 增加：检查左侧光标对应的 BBox
-            if not self._is_navigating_from_image:
-                 self.check_auto_scroll_bbox(self.edit_left, idx)
-        finally:
-            self._is_syncing_cursor = False
+        self._schedule_cursor_update(self.edit_left)
 
     def on_cursor_right(self):
-        if self._is_syncing_cursor: return
+        self._schedule_cursor_update(self.edit_right)
+
+    def _schedule_cursor_update(self, editor):
+        # 图片反向定位时由 on_image_bbox_click 自行完成两侧高亮
+        if self._is_syncing_cursor or self._is_navigating_from_image: return
+        self._pending_cursor_editor = editor
+        self.cursor_update_timer.start()
+
+    def _do_cursor_update(self):
+        """只处理连续光标移动中的最后一次：高亮对侧并同步图片框"""
+        editor = self._pending_cursor_editor
+        self._pending_cursor_editor = None
+        if editor is None: return
         self._is_syncing_cursor = True
         try:
-            idx = self.edit_right.textCursor().position()
-            self.edit_right.highlight_line_at_index(idx)
-            self.request_highlight_other(self.edit_right, idx)
-            if not self._is_navigating_from_image:
-                 self.check_auto_scroll_bbox(self.edit_right, idx)
+            idx = editor.textCursor().position()
+            editor.highlight_line_at_index(idx)
+            self.request_highlight_other(editor, idx)
+            # 增加：检查光标对应的 BBox
+            self.check_auto_scroll_bbox(editor, idx)
         finally:
             self._is_syncing_cursor = False
 
@@ -3428,6 +4020,7 @@ class MainWindow(QMainWindow):
                 value = re.sub(r"\{[^{}]*\}", "", value or "")
                 return re.sub(r"[\s・･▶>【】\[\]（）()]+", "", value).casefold()
 
+            import difflib  # 仅在文本定位回退到模糊匹配时使用
             targets = [normalize(value) for value in candidates if normalize(str(value or ""))]
             best = (0.0, None)
             offset = 0
@@ -3471,13 +4064,10 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("左侧文本未配置保存路径。", 5000)
             return False
         
-        if write_pages_to_file(self.pages_left, path):
-            self.dirty_pages_left.clear()
-            self.config_manager.save()
-            self.statusBar().showMessage(f"左侧文本已保存：{path}", 5000)
-            return True
-        self.statusBar().showMessage(f"左侧文本保存失败：{path}", 7000)
-        return False
+        self.queue_text_save(self.pages_left, path, "left", self.dirty_pages_left)
+        self.config_manager.save()
+        self.statusBar().showMessage(f"正在保存左侧文本：{path}", 5000)
+        return True
 
     def save_right_data(self, candidate_index=None, force=False):
         if not force and not self.is_text_source_selected():
@@ -3488,20 +4078,49 @@ class MainWindow(QMainWindow):
             candidate_index = getattr(self, "current_right_candidate_index", 0)
         if candidate_index == getattr(self, "current_right_candidate_index", 0):
             self.save_current_page_data()
-        pages = self.right_candidate_pages.get(candidate_index, self.pages_right_text)
+        pages = self.get_right_candidate_pages(candidate_index)
         candidates = getattr(self, "right_text_candidates", [])
         path = candidates[candidate_index].get("path", "") if 0 <= candidate_index < len(candidates) else ""
         if not path:
             self.statusBar().showMessage("右侧文本未配置保存路径。", 5000)
             return False
         
-        if write_pages_to_file(pages, path):
-            self.dirty_pages_right.get(candidate_index, set()).clear()
-            self.config_manager.save()
-            self.statusBar().showMessage(f"右侧文本已保存：{path}", 5000)
-            return True
-        self.statusBar().showMessage(f"右侧文本保存失败：{path}", 7000)
-        return False
+        self.queue_text_save(
+            pages, path, candidate_index, self.dirty_pages_right.setdefault(candidate_index, set())
+        )
+        self.config_manager.save()
+        self.statusBar().showMessage(f"正在保存右侧文本：{path}", 5000)
+        return True
+
+    def queue_text_save(self, pages, path, side, dirty_pages):
+        """提交后台保存并清除脏标记；side 为 "left" 或右侧候选序号"""
+        ticket = self.text_writer.submit(pages, path)
+        self._saving_dirty.setdefault(path, []).append((ticket, side, set(dirty_pages)))
+        dirty_pages.clear()
+
+    def on_text_saved(self, path, ok, ticket):
+        # 写入期间又提交的保存仍在排队，只结算这次写入覆盖到的提交
+        pending = self._saving_dirty.get(path, [])
+        done = [entry for entry in pending if entry[0] <= ticket]
+        rest = [entry for entry in pending if entry[0] > ticket]
+        if rest:
+            self._saving_dirty[path] = rest
+        else:
+            self._saving_dirty.pop(path, None)
+        if not done:
+            return
+        side = done[-1][1]
+        label = "左侧文本" if side == "left" else "右侧文本"
+        if ok:
+            self.statusBar().showMessage(f"{label}已保存：{path}", 5000)
+            return
+        # 写入失败，恢复脏标记以便再次保存
+        for _ticket, side, pages in done:
+            if side == "left":
+                self.dirty_pages_left.update(pages)
+            else:
+                self.dirty_pages_right.setdefault(side, set()).update(pages)
+        self.statusBar().showMessage(f"{label}保存失败：{path}", 7000)
 
     def save_current_side(self):
         """Save the side represented by the currently focused editing surface."""
@@ -3577,11 +4196,15 @@ class MainWindow(QMainWindow):
         save_dir = self.project_config.get("ocr_json_path", "ocr_results")
         from ocr.ocr_engines import get_result_path, get_legacy_result_paths
         
+        # 列一次目录代替逐页 stat；顺便刷新翻页用的目录缓存
+        self._dir_files_cache.pop(save_dir, None)
+        existing = self.get_dir_files(save_dir)
+        page_offset = self.project_config.get("page_offset", 0)
         for p in range(start, end + 1):
-            real_page_num = p + self.project_config.get("page_offset", 0)
+            real_page_num = p + page_offset
             engine_result_path = get_result_path(save_dir, real_page_num, engine, self.global_config)
             legacy_paths = get_legacy_result_paths(save_dir, real_page_num) if engine == PADDLE_ENGINE_ID else []
-            if not os.path.exists(engine_result_path) and not any(os.path.exists(path) for path in legacy_paths):
+            if not any(os.path.basename(path) in existing for path in [engine_result_path, *legacy_paths]):
                 missing_pages.append(p)
                 
         if not missing_pages:
@@ -3590,9 +4213,12 @@ class MainWindow(QMainWindow):
 
         ocr_pages = []
         skipped_pages = []
+        img_dir = self.project_config.get('image_dir')
+        img_files = self.get_dir_files(img_dir)
         for p in missing_pages:
             real_page_num = p + self.project_config.get("page_offset", 0)
-            if get_page_image(self.doc, self.project_config.get('image_dir'), real_page_num):
+            # 只判断图片是否存在，实际渲染交给 OCR 线程
+            if has_page_image(self.doc, img_dir, real_page_num, img_files):
                 ocr_pages.append(p)
             else:
                 skipped_pages.append(p)
@@ -3613,12 +4239,9 @@ class MainWindow(QMainWindow):
         self.start_ocr_thread('batch', ocr_pages)
 
     def start_ocr_thread(self, mode, pages):
-        # OCRWorker(mode, pages, project_config, global_config, engine, pdf_path)
+        # OCRWorker(mode, pages, project_config, global_config, engine)
         engine = canonical_engine_id(self.global_config.get("ocr_engine", "remote"))
-        
-        # Ensure pdf path is passed properly or handled in thread
-        pdf_path = self.project_config.get('pdf_path')
-        
+
         worker = OCRWorker(mode, pages, self.project_config, self.global_config, engine)
         worker.project_name = self.project_config.get("name") # Tag with project name
         worker.progress.connect(self.on_ocr_progress)
@@ -3649,6 +4272,10 @@ class MainWindow(QMainWindow):
         if not worker:
             return
 
+        # 结果文件已重写，丢弃缓存的 OCR 解析结果和目录列表
+        self._ocr_page_cache.clear()
+        self._dir_files_cache.clear()
+
         is_current_project = (getattr(worker, 'project_name', None) == self.project_config.get("name"))
         is_active_worker = getattr(self, 'ocr_thread', None) is worker
 
@@ -3802,7 +4429,7 @@ class MainWindow(QMainWindow):
                 except Exception:
                     doc = None
         try:
-            if not get_page_image(
+            if not has_page_image(
                 doc,
                 self.project_config.get('image_dir'),
                 real_page_num,
@@ -3871,6 +4498,7 @@ class MainWindow(QMainWindow):
 
     def on_settings_changed(self):
         self.global_config = self.config_manager.get_global()
+        self._ocr_page_cache.clear() # 解析结果依赖全局 OCR 设置
         self.refresh_ocr_engine_combo()
 
     def on_editor_focus(self):
@@ -3910,15 +4538,9 @@ class MainWindow(QMainWindow):
         )
 
         # 图片反向定位文本时也保留当前细粒度矩形框。
-        entries = self.find_ocr_bbox_entries_for_index(start_py_idx)
-        if entries:
-            self.image_view.set_highlight_bboxes(
-                [
-                    (x1, y1, x2 - x1, y2 - y1, level)
-                    for level, (x1, y1, x2, y2) in entries
-                ],
-                ensure_visible=False,
-            )
+        rects = self.find_ocr_highlight_rects(start_py_idx)
+        if rects:
+            self.image_view.set_highlight_bboxes(rects, ensure_visible=False)
         
         # Determine target
         target = self.last_active_editor
@@ -3928,7 +4550,7 @@ class MainWindow(QMainWindow):
         
         if target == self.edit_right and not self.is_text_source_selected():
              # OCR Mode: Right IS OCR.
-             target_pos = to_qt_pos(self.edit_right.toPlainText(), start_py_idx)
+             target_pos = to_qt_pos(self.edit_right.plain_text(), start_py_idx)
         else:
              # Need Mapping: OCR -> Left
              # opcodes: Left <-> OCR
@@ -3943,12 +4565,12 @@ class MainWindow(QMainWindow):
              
              if left_py_idx != -1:
                  if target == self.edit_left:
-                     text = self.edit_left.toPlainText()
+                     text = self.edit_left.plain_text()
                      target_pos = to_qt_pos(text, left_py_idx)
                  else:
                      # Target is Right (Text B)
                      # Map Left -> Right
-                     right_qt_pos = self.get_mapped_index(to_qt_pos(self.edit_left.toPlainText(), left_py_idx), True)
+                     right_qt_pos = self.get_mapped_index(to_qt_pos(self.edit_left.plain_text(), left_py_idx), True)
                      target_pos = right_qt_pos
         
         if target_pos != -1:
@@ -4042,10 +4664,11 @@ class MainWindow(QMainWindow):
         import copy
         self.pages_left = copy.deepcopy(snapshot.get('left', {}))
         if snapshot.get('right_candidates') is not None:
+            # 快照时尚未读取的候选文本不在其中，之后按需从文件重新读取
             self.right_candidate_pages = copy.deepcopy(snapshot['right_candidates'])
             active = int(snapshot.get('active_right_candidate', self.current_right_candidate_index) or 0)
             self.current_right_candidate_index = min(active, max(0, len(self.right_text_candidates) - 1))
-            self.pages_right_text = self.right_candidate_pages.get(self.current_right_candidate_index, {})
+            self.pages_right_text = self.get_right_candidate_pages(self.current_right_candidate_index)
         else:
             self.pages_right_text = copy.deepcopy(snapshot.get('right', {}))
             self.right_candidate_pages[self.current_right_candidate_index] = self.pages_right_text
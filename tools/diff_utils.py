@@ -0,0 +1,156 @@
+import difflib
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# rapidfuzz 为可选依赖：安装后使用其 C++ 实现生成编辑脚本，否则回退到 difflib
+HAS_RAPIDFUZZ = importlib.util.find_spec("rapidfuzz") is not None
+if HAS_RAPIDFUZZ:
+    from rapidfuzz.distance import Levenshtein
+
+
+def _raw_opcodes(a: str, b: str) -> list[tuple]:
+    if HAS_RAPIDFUZZ:
+        return Levenshtein.opcodes(a, b).as_list()
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    # 二分比较切片，比较本身在 C 层完成
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_len(a: str, b: str) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def compute_opcodes(a: str, b: str) -> list[tuple]:
+    """Return SequenceMatcher-style (tag, i1, i2, j1, j2) opcodes turning a into b.
+
+    Unchanged leading and trailing lines are split off first, so a small edit
+    only diffs the lines around it.
+    """
+    prefix = _common_prefix_len(a, b)
+    prefix = a.rfind("\n", 0, prefix) + 1  # 对齐到整行
+    suffix = _common_suffix_len(a[prefix:], b[prefix:])
+    start = len(a) - suffix
+    if suffix and start > 0 and a[start - 1] != "\n":
+        nl = a.find("\n", start)
+        suffix = len(a) - (nl + 1) if nl != -1 else 0
+    a_end = len(a) - suffix
+    b_end = len(b) - suffix
+
+    opcodes = []
+    if prefix:
+        opcodes.append(("equal", 0, prefix, 0, prefix))
+    for tag, i1, i2, j1, j2 in _raw_opcodes(a[prefix:a_end], b[prefix:b_end]):
+        op = (tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+        if tag == "equal" and opcodes and opcodes[-1][0] == "equal":
+            last = opcodes.pop()
+            op = ("equal", last[1], op[2], last[3], op[4])
+        opcodes.append(op)
+    if suffix:
+        if opcodes and opcodes[-1][0] == "equal":
+            last = opcodes.pop()
+            opcodes.append(("equal", last[1], len(a), last[3], len(b)))
+        else:
+            opcodes.append(("equal", a_end, len(a), b_end, len(b)))
+    return opcodes
+
+
+# 会话内 LRU，按文本内容命中；翻页来回切换时不必重算
+_MEMO_SIZE = 32
+_memo = OrderedDict()
+_lock = threading.Lock()
+# 磁盘缓存目录（None 表示关闭），按内容哈希命名，文本一改自然失效
+_cache_dir = None
+# 算得比读文件还快的结果不落盘，也避免打字时每次 diff 都写一个文件
+_DISK_MIN_SECONDS = 0.05
+
+
+def set_opcode_cache_dir(path, max_files=2000):
+    """Enable the on-disk opcode cache under path (None disables it).
+
+    Only the max_files most recently written entries are kept.
+    """
+    global _cache_dir
+    _cache_dir = path
+    if not path:
+        return
+    try:
+        os.makedirs(path, exist_ok=True)
+        entries = [e for e in os.scandir(path) if e.name.endswith(".json")]
+        if len(entries) > max_files:
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for e in entries[:len(entries) - max_files]:
+                os.remove(e.path)
+    except OSError as e:
+        print(f"Diff cache unavailable: {e}")
+        _cache_dir = None
+
+
+def _disk_path(a: str, b: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"rapidfuzz" if HAS_RAPIDFUZZ else b"difflib") # 两种实现的结果不互通
+    for text in (a, b):
+        data = text.encode("utf-8", "surrogatepass")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return os.path.join(_cache_dir, h.hexdigest() + ".json")
+
+
+def cached_opcodes(a: str, b: str) -> list[tuple]:
+    """compute_opcodes backed by a session LRU and the optional disk cache.
+
+    The returned list is shared between callers and must not be modified.
+    """
+    key = (a, b)
+    with _lock:
+        opcodes = _memo.get(key)
+        if opcodes is not None:
+            _memo.move_to_end(key)
+            return opcodes
+
+    path = _disk_path(a, b) if _cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                opcodes = [tuple(op) for op in json.load(f)]
+        except (OSError, ValueError):
+            opcodes = None
+
+    if opcodes is None:
+        started = time.perf_counter()
+        opcodes = compute_opcodes(a, b)
+        if path and time.perf_counter() - started >= _DISK_MIN_SECONDS:
+            tmp_path = path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(opcodes, f, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Diff cache write failed: {e}")
+
+    with _lock:
+        _memo[key] = opcodes
+        if len(_memo) > _MEMO_SIZE:
+            _memo.popitem(last=False)
+    return opcodes
@@ -1,12 +1,12 @@
 import os
 import json
 import re
+import bisect
 import base64
 from PyQt6.QtWidgets import (
     QMessageBox, QFileDialog, QProgressDialog, QDialog, QVBoxLayout, QFormLayout,
     QComboBox, QDialogButtonBox, QLabel, QApplication,
 )
-import requests
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from ocr.ocr_engines import (
     sort_ocr_results_by_priority,
@@ -14,6 +14,7 @@ from ocr.ocr_engines import (
     ENGINE_DEFS,
     PADDLE_ENGINE_ID,
     engine_id_from_suffix,
+    http_client,
     result_label_from_suffix,
 )
 from lang.i18n import text_from_config
@@ -84,6 +85,7 @@ class MarkdownImageDownloader(QThread):
         self.is_running = True
 
     def run(self):
+        requests = http_client()
         count = 0
         success = True
         total = len(self.tasks)
@@ -120,10 +122,16 @@ class MarkdownImageDownloader(QThread):
         
     def stop(self):
         self.is_running = False
+# 去除每行首尾空白（不含换行）并合并空行，整页一次完成
+_STRIP_RE = re.compile(r'^[^\S\n]+|[^\S\n]+$', re.MULTILINE)
+_BLANK_RE = re.compile(r'\n{2,}')
+
+
 class ExportParser:
     def __init__(self, pages_dict: dict, regex_str: str, group_id: int = 0):
         self.pages_dict = pages_dict # {page_num: text}
         self.group_id = group_id
+        self.page_regex = None
         if regex_str:
             try:
                 self.regex = re.compile(regex_str)
@@ -131,25 +139,51 @@ class ExportParser:
                 self.regex = None
         else:
             self.regex = None
+        # 整页扫描：多行模式下逐行能匹配的词头在拼接全文上也必然能匹配；
+        # 含环视或 \A \Z \B 的表达式跨行行为不同，保守地退回逐行匹配。
+        if self.regex and not re.search(r'\(\?<?[=!]|\\[AZB]', regex_str):
+            self.page_regex = re.compile(regex_str, self.regex.flags | re.MULTILINE)
         
     def parse(self):
         entries = []
         if not self.pages_dict or not self.regex: 
             return entries
             
-        sorted_pages = sorted(self.pages_dict.keys())
+        # 页码通常按顺序插入，已有序时省去排序
+        sorted_pages = list(self.pages_dict)
+        if any(a > b for a, b in zip(sorted_pages, sorted_pages[1:])):
+            sorted_pages.sort()
         current_entry = None
+        # 预先确定分组号，不存在的分组回退到整个匹配
+        group_id = self.group_id
+        if group_id not in self.regex.groupindex and not (
+            isinstance(group_id, int) and 0 <= group_id <= self.regex.groups
+        ):
+            group_id = 0
         
+        if self.page_regex:
+            headwords = self._scan_headwords(sorted_pages, group_id)
+        else:
+            headwords = None
+
         for page_num in sorted_pages:
             page_text = self.pages_dict[page_num]
-            lines = page_text.split('\n')
-            
-            page_headword_indices = []
-            for i, line in enumerate(lines):
-                m = self.regex.search(line)
-                if m:
-                    page_headword_indices.append((i, m))
-                    
+            if headwords is not None:
+                page_headword_indices = headwords.get(page_num)
+                if not page_headword_indices:
+                    # 无词头的续页直接并入上一词条，省去逐行扫描
+                    if current_entry:
+                        self._append_text_to_entry(current_entry, page_text, page_num)
+                    continue
+                lines = page_text.split('\n')
+            else:
+                lines = page_text.split('\n')
+                page_headword_indices = []
+                for i, line in enumerate(lines):
+                    m = self.regex.search(line)
+                    if m:
+                        page_headword_indices.append((i, m.group(group_id)))
+
             if not page_headword_indices:
                 if current_entry:
                     self._append_text_to_entry(current_entry, lines, page_num)
@@ -163,12 +197,7 @@ class ExportParser:
                 if current_entry:
                     self._append_text_to_entry(current_entry, pre_text_lines, page_num)
                 
-            for k, (line_idx, match) in enumerate(page_headword_indices):
-                try:
-                    headword = match.group(self.group_id)
-                except IndexError:
-                    headword = match.group(0)
-                    
+            for k, (line_idx, headword) in enumerate(page_headword_indices):
                 content_lines = []
                 line_content = lines[line_idx]
                 content_lines.append(line_content)
@@ -193,14 +222,55 @@ class ExportParser:
              
         return entries
 
+    def _scan_headwords(self, sorted_pages, group_id):
+        """在拼接后的全文上一次扫描，返回 {page_num: [(line_idx, headword)]}。
+
+        多行模式的搜索只用来跳过不含词头的行，命中行仍按原来的逐行规则取词头，
+        跨行的匹配因此不会改变结果。
+        """
+        texts = [self.pages_dict[p] for p in sorted_pages]
+        joined = '\n'.join(texts)
+        page_starts = []
+        pos = 0
+        for t in texts:
+            page_starts.append(pos)
+            pos += len(t) + 1
+
+        hits = {}
+        search = self.page_regex.search
+        line_search = self.regex.search
+        n = len(joined)
+        page_idx, line_pos, line_idx = -1, 0, 0
+        pos = 0
+        while pos <= n:
+            m = search(joined, pos)
+            if not m:
+                break
+            line_start = joined.rfind('\n', 0, m.start()) + 1
+            line_end = joined.find('\n', m.start())
+            if line_end == -1:
+                line_end = n
+            lm = line_search(joined[line_start:line_end])
+            if lm:
+                k = bisect.bisect_right(page_starts, line_start) - 1
+                if k != page_idx:
+                    page_idx, line_pos, line_idx = k, page_starts[k], 0
+                line_idx += joined.count('\n', line_pos, line_start)
+                line_pos = line_start
+                hits.setdefault(sorted_pages[k], []).append((line_idx, lm.group(group_id)))
+            pos = line_end + 1
+        return hits
+
     def _append_text_to_entry(self, entry, lines, page_num):
-        valid_lines = [l.strip() for l in lines if l.strip()]
-        if not valid_lines: return
+        if isinstance(lines, str):
+            text_chunk = _BLANK_RE.sub('\n', _STRIP_RE.sub('', lines)).strip('\n')
+        else:
+            text_chunk = "\n".join(filter(None, (l.strip() for l in lines)))
+        if not text_chunk: return
         
         if page_num not in entry["pages"]:
             entry["pages"].append(page_num)
             
-        text_chunk = "\n".join(valid_lines)
         
         if not entry["text"]:
             entry["text"] = text_chunk
@@ -296,7 +366,8 @@ class ExportManager:
         order = {canonical_engine_id(str(engine_id)): idx for idx, engine_id in enumerate(priority)}
         return pages, sorted(sources.items(), key=lambda item: (order.get(item[0], len(order)), item[1]))
 
-    def _make_ocr_text_for_pages(self, page_results, engine_id=None, progress=None, progress_offset=0, finish_progress=True):
+    def _make_ocr_text_for_pages(self, page_results, engine_id=None, progress=None, progress_offset=0, finish_progress=True, out=None):
+        """out: 给出时逐页写入该文件对象，不在内存中拼接全文（返回的文本为空串）"""
         chunks = []
         used = {}
         for idx, (p, results) in enumerate(page_results.items(), start=1):
@@ -326,7 +397,10 @@ class ExportManager:
                 continue
             source_label = selected.get("label") or selected.get("engine_id") or "OCR"
             used[source_label] = used.get(source_label, 0) + 1
-            chunks.append(f"<{p}>\n{text}\n")
+            if out is not None:
+                out.write(f"<{p}>\n{text}\n")
+            else:
+                chunks.append(f"<{p}>\n{text}\n")
         if progress and finish_progress:
             progress.setValue(progress.maximum())
             QApplication.processEvents()
@@ -467,18 +541,9 @@ class ExportManager:
             QMessageBox.warning(self.mw, "Error", f"No OCR data for page {pg}")
             return
             
-        doc = None
-        if self.mw.project_config.get('pdf_path') and os.path.exists(self.mw.project_config.get('pdf_path')):
-            import fitz
-            try: doc = fitz.open(self.mw.project_config.get('pdf_path'))
-            except: pass
-            
-        from ocr.ocr_utils import get_page_image, cut_image
-        real_page = pg + self.mw.project_config.get('page_offset', 0)
-        img_bytes = get_page_image(doc, self.mw.project_config.get('image_dir'), real_page)
-        if doc: doc.close()
-        
-        if not img_bytes:
+        # 当前页通常已在翻页时缓存，不必重新渲染 PDF
+        pix = self.mw.get_page_pixmap(pg)
+        if pix is None:
             QMessageBox.warning(self.mw, "Error", "Could not load image.")
             return
             
@@ -486,24 +551,30 @@ class ExportManager:
         export_dir = QFileDialog.getExistingDirectory(self.mw, "Select slice export directory", default_dir)
         if not export_dir: return
         
-        count = 0
-        try:
-            for item in data:
-                if isinstance(item, dict) and 'bbox' in item:
-                    box = item['bbox']
-                    slice_img = cut_image(img_bytes, box)
-                    if slice_img:
-                        txt = item.get('text', f'slice_{count}')
-                        safe_txt = re.sub(r'[\\/*?:"<>|]', '_', txt)[:30]
-                        path = os.path.join(export_dir, f"{safe_txt}.jpg")
-                        slice_img.save(path)
-                        count += 1
-            if count > 0:
-                QMessageBox.information(self.mw, "Success", f"Exported {count} slices.")
-            else:
-                 QMessageBox.warning(self.mw, "Warning", "No bbox slices found.")
-        except Exception as e:
-            QMessageBox.warning(self.mw, "Error", f"Export slice failed: {e}")
+        # 裁剪和编码放到后台线程，块多时界面不再卡住
+        from ocr.ocr_worker import SliceExportWorker
+        self.mw.slice_export_worker = SliceExportWorker(data, pix.toImage(), export_dir)
+        
+        self.mw.progress_dlg = QProgressDialog("Exporting slices...", "Cancel", 0, max(1, len(self.mw.slice_export_worker.items)), self.mw)
+        self.mw.progress_dlg.setWindowTitle("Exporting Slices")
+        self.mw.progress_dlg.setWindowModality(Qt.WindowModality.WindowModal)
+        self.mw.progress_dlg.setMinimumDuration(0)
+        self.mw.progress_dlg.show()
+        
+        self.mw.slice_export_worker.progress_val.connect(self.mw.progress_dlg.setValue)
+        self.mw.slice_export_worker.finished.connect(self.on_slice_export_finished)
+        self.mw.progress_dlg.canceled.connect(self.mw.slice_export_worker.stop)
+        
+        self.mw.slice_export_worker.start()
+
+    def on_slice_export_finished(self, success, msg):
+        if hasattr(self.mw, 'progress_dlg'):
+            self.mw.progress_dlg.close()
+        if success:
+            QMessageBox.information(self.mw, "Success", msg)
+        else:
+            QMessageBox.warning(self.mw, "Warning", msg)
+        self.mw.slice_export_worker = None
 
     def export_ocr_dict_current(self):
         pg = self.mw.get_current_page()
@@ -564,22 +635,34 @@ class ExportManager:
             try:
                 offset = 0
                 for engine_id, label in sources:
-                    text, used, canceled = self._make_ocr_text_for_pages(
-                        page_results,
-                        engine_id,
-                        progress=progress,
-                        progress_offset=offset,
-                        finish_progress=False,
-                    )
+                    filename = os.path.join(export_dir, f"{proj_name}_{self._safe_filename_part(label)}.txt")
+                    # 边读边写到临时文件，有内容才替换目标文件
+                    part_path = filename + ".part"
+                    try:
+                        with open(part_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                            _text, used, canceled = self._make_ocr_text_for_pages(
+                                page_results,
+                                engine_id,
+                                progress=progress,
+                                progress_offset=offset,
+                                finish_progress=False,
+                                out=f,
+                            )
+                    except BaseException:
+                        # 写到一半出错，不留下残缺的临时文件
+                        try:
+                            os.remove(part_path)
+                        except OSError:
+                            pass
+                        raise
                     offset += len(page_results)
                     progress.setValue(min(offset, progress.maximum()))
-                    if canceled or progress.wasCanceled():
-                        break
-                    if not text.strip():
+                    if canceled or progress.wasCanceled() or not used:
+                        os.remove(part_path)
+                        if canceled or progress.wasCanceled():
+                            break
                         continue
-                    filename = os.path.join(export_dir, f"{proj_name}_{self._safe_filename_part(label)}.txt")
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(text)
+                    os.replace(part_path, filename)
                     written.append(os.path.basename(filename))
             finally:
                 progress.close()
@@ -763,6 +846,7 @@ class ExportManager:
         return True
 
     def export_parsed(self, side, fmt):
+        self.mw.flush_pending_edits()
         pages = self.mw.pages_left if side == 'left' else self.mw.pages_right_text
         if not pages:
             QMessageBox.warning(self.mw, "Error", f"No data for {side} side.")
@@ -825,6 +909,7 @@ class ExportManager:
             
         force_overwrite = self.mw.action_force_recreate.isChecked()
         
+        self.mw.flush_pending_edits()
         pages = self.mw.pages_left if side == 'left' else self.mw.pages_right_text
         if not pages:
             QMessageBox.warning(self.mw, "Error", f"No data for {side} side.")
@@ -1,4 +1,3 @@
-import difflib
 import html
 import re
 from dataclasses import dataclass, field
@@ -6,6 +5,8 @@ from dataclasses import dataclass, field
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import QTextEdit
 
+from tools.diff_utils import compute_opcodes
+
 
 BLOCK_TAGS = {
     "address", "article", "aside", "blockquote", "br", "div", "dl", "dt",
@@ -561,10 +562,7 @@ def map_projection_opcodes(opcodes, projection_left, projection_right):
 
 def projection_for_rendered_text(projection, rendered_plain_text):
     """Compose Qt's rendered plain-text positions back to source positions."""
-    matcher = difflib.SequenceMatcher(
-        None, projection.visible_text, rendered_plain_text, autojunk=False
-    )
-    opcodes = matcher.get_opcodes()
+    opcodes = compute_opcodes(projection.visible_text, rendered_plain_text)
     mapping = []
     last_visible = 0
     for rendered_position in range(len(rendered_plain_text)):
@@ -600,10 +598,9 @@ def apply_visible_text_edit(source, projection, new_visible_text):
     """Apply visible-text edits while preserving hidden markup between characters."""
     old_visible = projection.visible_text
     mapping = projection.visible_to_source
-    matcher = difflib.SequenceMatcher(None, old_visible, new_visible_text, autojunk=False)
     output = []
     source_cursor = 0
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in compute_opcodes(old_visible, new_visible_text):
         start_source = mapping[i1]
         if start_source > source_cursor:
             output.append(source[source_cursor:start_source])
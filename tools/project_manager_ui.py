@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTabWidget, QWid
                              QListWidget, QListWidgetItem, QPushButton, QSpinBox, QLabel, QFileDialog,
                              QInputDialog, QMessageBox, QComboBox, QTextEdit, QStackedWidget,
                              QCheckBox, QDoubleSpinBox)
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QKeySequence
 from ocr.ocr_engines import ENGINE_DEFS, PADDLE_ENGINE_ID, canonical_engine_id
 from ocr.ocr_worker import refresh_remote_engine_label
@@ -17,6 +17,16 @@ class ProjectManagerDialog(QDialog):
         self.setWindowTitle("Settings & Project Manager")
         self.resize(800, 600)
         self.config_manager = config_manager
+
+        # 输入过程中的修改合并为一次写盘
+        self._global_save_timer = QTimer(self)
+        self._global_save_timer.setSingleShot(True)
+        self._global_save_timer.setInterval(300)
+        self._global_save_timer.timeout.connect(self.save_global)
+        self._project_save_timer = QTimer(self)
+        self._project_save_timer.setSingleShot(True)
+        self._project_save_timer.setInterval(300)
+        self._project_save_timer.timeout.connect(self.save_current_project)
         
         # UI Layout
         layout = QVBoxLayout(self)
@@ -41,6 +51,25 @@ class ProjectManagerDialog(QDialog):
         btns = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         btns.rejected.connect(self.accept) # Close acts as confirm/exit
         layout.addWidget(btns)
+
+    def schedule_save_global(self, *args):
+        self._global_save_timer.start()
+
+    def schedule_save_project(self, *args):
+        self._project_save_timer.start()
+
+    def flush_pending_saves(self):
+        """立即执行尚未触发的延迟保存"""
+        if self._global_save_timer.isActive():
+            self._global_save_timer.stop()
+            self.save_global()
+        if self._project_save_timer.isActive():
+            self._project_save_timer.stop()
+            self.save_current_project()
+
+    def done(self, result):
+        self.flush_pending_saves()
+        super().done(result)
         
     def init_global_tab(self):
         layout = QFormLayout(self.tab_global)
@@ -52,17 +81,17 @@ class ProjectManagerDialog(QDialog):
         
         # Shortcuts logic
         self.input_furigana.setKeySequence(QKeySequence(g.get("shortcut_furigana", "Ctrl+Shift+F")))
-        self.input_furigana.keySequenceChanged.connect(self.save_global)
+        self.input_furigana.keySequenceChanged.connect(self.schedule_save_global)
         layout.addRow("Furigana Shortcut:", self.input_furigana)
 
         self.input_furigana_left = QLineEdit()
         self.input_furigana_left.setText(g.get("furigana_left_marker", "["))
-        self.input_furigana_left.textChanged.connect(self.save_global)
+        self.input_furigana_left.textChanged.connect(self.schedule_save_global)
         layout.addRow("Ruby Left Marker:", self.input_furigana_left)
 
         self.input_furigana_right = QLineEdit()
         self.input_furigana_right.setText(g.get("furigana_right_marker", "]"))
-        self.input_furigana_right.textChanged.connect(self.save_global)
+        self.input_furigana_right.textChanged.connect(self.schedule_save_global)
         layout.addRow("Ruby Right Marker:", self.input_furigana_right)
 
         self.combo_furigana_kana = QComboBox()
@@ -70,19 +99,19 @@ class ProjectManagerDialog(QDialog):
         self.combo_furigana_kana.addItem("Katakana", "katakana")
         kana_idx = self.combo_furigana_kana.findData(g.get("furigana_kana_type", "hiragana"))
         self.combo_furigana_kana.setCurrentIndex(kana_idx if kana_idx >= 0 else 0)
-        self.combo_furigana_kana.currentIndexChanged.connect(self.save_global)
+        self.combo_furigana_kana.currentIndexChanged.connect(self.schedule_save_global)
         layout.addRow("Ruby Reading Kana:", self.combo_furigana_kana)
 
         self.chk_furigana_split = QCheckBox()
         self.chk_furigana_split.setChecked(bool(g.get("furigana_use_jmdict_split", True)))
-        self.chk_furigana_split.toggled.connect(self.save_global)
+        self.chk_furigana_split.toggled.connect(self.schedule_save_global)
         layout.addRow("Split Readings (JMDict):", self.chk_furigana_split)
         
         alt_texts = g.get("shortcuts_alt", [""] * 10)
         for i in range(10):
             le = QLineEdit()
             le.setText(alt_texts[i] if i < len(alt_texts) else "")
-            le.textChanged.connect(self.save_global)
+            le.textChanged.connect(self.schedule_save_global)
             self.inputs_alt.append(le)
             layout.addRow(f"Alt+{i} Text:", le)
 
@@ -103,16 +132,22 @@ class ProjectManagerDialog(QDialog):
         self.spin_retry = QSpinBox()
         self.spin_retry.setRange(1, 10)
         self.spin_retry.setValue(int(g.get("ocr_retry_count", 3)))
-        self.spin_retry.valueChanged.connect(self.save_global)
+        self.spin_retry.valueChanged.connect(self.schedule_save_global)
 
         self.spin_concurrent = QSpinBox()
         self.spin_concurrent.setRange(1, 8)
         self.spin_concurrent.setValue(int(g.get("ocr_concurrent_tasks", 2)))
-        self.spin_concurrent.valueChanged.connect(self.save_global)
+        self.spin_concurrent.valueChanged.connect(self.schedule_save_global)
+
+        self.spin_request_interval = QDoubleSpinBox()
+        self.spin_request_interval.setRange(0, 10)
+        self.spin_request_interval.setSingleStep(0.1)
+        self.spin_request_interval.setValue(float(g.get("ocr_min_request_interval", 0)))
+        self.spin_request_interval.valueChanged.connect(self.schedule_save_global)
 
         self.input_excluded_labels = QLineEdit()
         self.input_excluded_labels.setText(g.get("ocr_excluded_labels", "image,table,formula,Illustration,PrintedFormula,WrittenFormula"))
-        self.input_excluded_labels.textChanged.connect(self.save_global)
+        self.input_excluded_labels.textChanged.connect(self.schedule_save_global)
 
         self.list_ocr_priority = QListWidget()
         priority = g.get("ocr_result_priority") or [PADDLE_ENGINE_ID, "chrome_lens", "textin", "mineru", "quark", "local"]
@@ -138,6 +173,7 @@ class ProjectManagerDialog(QDialog):
 
         common_layout.addRow("Retry Count:", self.spin_retry)
         common_layout.addRow("Concurrent Tasks:", self.spin_concurrent)
+        common_layout.addRow("Min Request Interval (s):", self.spin_request_interval)
         common_layout.addRow("Excluded Labels:", self.input_excluded_labels)
         common_layout.addRow("OCR Result Priority:", self.list_ocr_priority)
         common_layout.addRow("", priority_buttons)
@@ -145,7 +181,7 @@ class ProjectManagerDialog(QDialog):
         paddle_page, paddle_layout = self._add_ocr_page("PaddleOCR")
         self.input_api_token = QLineEdit()
         self.input_api_token.setText(g.get("ocr_api_token", ""))
-        self.input_api_token.textChanged.connect(self.save_global)
+        self.input_api_token.textChanged.connect(self.schedule_save_global)
 
         paddle = engines.setdefault("paddleocr", {})
         self.chk_paddle_orientation = QCheckBox()
@@ -155,7 +191,7 @@ class ProjectManagerDialog(QDialog):
         self.chk_paddle_chart = QCheckBox()
         self.chk_paddle_chart.setChecked(bool(paddle.get("useChartRecognition", False)))
         for widget in [self.chk_paddle_orientation, self.chk_paddle_unwarp, self.chk_paddle_chart]:
-            widget.toggled.connect(self.save_global)
+            widget.toggled.connect(self.schedule_save_global)
         paddle_layout.addRow("API Token:", self.input_api_token)
         paddle_layout.addRow("Use Orientation Classify:", self.chk_paddle_orientation)
         paddle_layout.addRow("Use Doc Unwarping:", self.chk_paddle_unwarp)
@@ -320,7 +356,7 @@ class ProjectManagerDialog(QDialog):
             self.input_quark_sign_method,
             self.input_chrome_lens_note,
         ]:
-            widget.textChanged.connect(self.save_global)
+            widget.textChanged.connect(self.schedule_save_global)
 
         for widget in [
             self.chk_textin_table, self.chk_textin_chars, self.chk_textin_images,
@@ -330,15 +366,15 @@ class ProjectManagerDialog(QDialog):
             self.chk_quark_return_image,
             self.chk_mineru_table, self.chk_mineru_formula, self.chk_mineru_ocr, self.chk_mineru_no_cache,
         ]:
-            widget.toggled.connect(self.save_global)
-        self.combo_textin_table_view.currentIndexChanged.connect(self.save_global)
-        self.combo_textin_force_engine.currentIndexChanged.connect(self.save_global)
-        self.combo_textin_parse_mode.currentIndexChanged.connect(self.save_global)
-        self.combo_textin_image_output_type.currentIndexChanged.connect(self.save_global)
-        self.spin_textin_formula_level.valueChanged.connect(self.save_global)
-        self.combo_quark_function.currentIndexChanged.connect(self.save_global)
-        self.combo_mineru_language.currentIndexChanged.connect(self.save_global)
-        self.spin_mineru_poll_interval.valueChanged.connect(self.save_global)
+            widget.toggled.connect(self.schedule_save_global)
+        self.combo_textin_table_view.currentIndexChanged.connect(self.schedule_save_global)
+        self.combo_textin_force_engine.currentIndexChanged.connect(self.schedule_save_global)
+        self.combo_textin_parse_mode.currentIndexChanged.connect(self.schedule_save_global)
+        self.combo_textin_image_output_type.currentIndexChanged.connect(self.schedule_save_global)
+        self.spin_textin_formula_level.valueChanged.connect(self.schedule_save_global)
+        self.combo_quark_function.currentIndexChanged.connect(self.schedule_save_global)
+        self.combo_mineru_language.currentIndexChanged.connect(self.schedule_save_global)
+        self.spin_mineru_poll_interval.valueChanged.connect(self.schedule_save_global)
         self.ocr_nav.setCurrentRow(0)
 
     def _add_ocr_page(self, title):
@@ -371,6 +407,8 @@ class ProjectManagerDialog(QDialog):
             g["ocr_retry_count"] = self.spin_retry.value()
         if hasattr(self, "spin_concurrent"):
             g["ocr_concurrent_tasks"] = self.spin_concurrent.value()
+        if hasattr(self, "spin_request_interval"):
+            g["ocr_min_request_interval"] = self.spin_request_interval.value()
         if hasattr(self, "input_excluded_labels"):
             g["ocr_excluded_labels"] = self.input_excluded_labels.text()
         if hasattr(self, "list_ocr_priority"):
@@ -468,7 +506,7 @@ class ProjectManagerDialog(QDialog):
         
         # 1. Project Name (Editable)
         self.inp_name = QLineEdit()
-        self.inp_name.editingFinished.connect(self.save_current_project)
+        self.inp_name.editingFinished.connect(self.save_current_project) # 重命名需立即生效
         self.form_layout.addRow("Name:", self.inp_name)
         
         # 2. Paths with Browse Buttons
@@ -496,9 +534,9 @@ class ProjectManagerDialog(QDialog):
         self.spin_end = QSpinBox(); self.spin_end.setRange(1, 9999)
         self.spin_offset = QSpinBox(); self.spin_offset.setRange(-999, 999)
         
-        self.spin_start.valueChanged.connect(self.save_current_project)
-        self.spin_end.valueChanged.connect(self.save_current_project)
-        self.spin_offset.valueChanged.connect(self.save_current_project)
+        self.spin_start.valueChanged.connect(self.schedule_save_project)
+        self.spin_end.valueChanged.connect(self.schedule_save_project)
+        self.spin_offset.valueChanged.connect(self.schedule_save_project)
         
         self.form_layout.addRow("Start Page:", self.spin_start)
         self.form_layout.addRow("End Page:", self.spin_end)
@@ -507,14 +545,14 @@ class ProjectManagerDialog(QDialog):
         # 4. Regex
         self.inp_reg_l = QLineEdit()
         self.inp_reg_r = QLineEdit()
-        self.inp_reg_l.editingFinished.connect(self.save_current_project)
-        self.inp_reg_r.editingFinished.connect(self.save_current_project)
+        self.inp_reg_l.editingFinished.connect(self.schedule_save_project)
+        self.inp_reg_r.editingFinished.connect(self.schedule_save_project)
         
         # Group IDs
         self.spin_reg_grp_l = QSpinBox(); self.spin_reg_grp_l.setRange(0, 99);
         self.spin_reg_grp_r = QSpinBox(); self.spin_reg_grp_r.setRange(0, 99);
-        self.spin_reg_grp_l.valueChanged.connect(self.save_current_project)
-        self.spin_reg_grp_r.valueChanged.connect(self.save_current_project)
+        self.spin_reg_grp_l.valueChanged.connect(self.schedule_save_project)
+        self.spin_reg_grp_r.valueChanged.connect(self.schedule_save_project)
 
         h_l = QHBoxLayout(); h_l.addWidget(self.inp_reg_l); h_l.addWidget(QLabel("Grp:")); h_l.addWidget(self.spin_reg_grp_l)
         h_r = QHBoxLayout(); h_r.addWidget(self.inp_reg_r); h_r.addWidget(QLabel("Grp:")); h_r.addWidget(self.spin_reg_grp_r)
@@ -523,6 +561,12 @@ class ProjectManagerDialog(QDialog):
         self.form_layout.addRow("Regex Right:", h_r)
         
         layout.addWidget(self.form_widget, 2)
+
+        # 加载项目时需要屏蔽信号的输入控件
+        self._inputs = [self.inp_pdf, self.inp_img_dir, self.inp_left_txt, self.inp_right_txt, 
+                        self.inp_ocr_json, self.inp_export_dir, self.inp_reg_l, self.inp_reg_r, self.inp_name,
+                        self.spin_start, self.spin_end, self.spin_offset,
+                        self.spin_reg_grp_l, self.spin_reg_grp_r]
         
         self.current_project_original_name = None
         self.refresh_project_list()
@@ -533,11 +577,13 @@ class ProjectManagerDialog(QDialog):
         h.setContentsMargins(0,0,0,0)
         
         line_edit = QLineEdit()
-        line_edit.editingFinished.connect(self.save_current_project)
+        line_edit.editingFinished.connect(self.schedule_save_project)
+        line_edit.setProperty("browse_mode", mode)
+        line_edit.setProperty("browse_filter", filter_str)
         
         btn = QPushButton("...")
         btn.setFixedWidth(30)
-        btn.clicked.connect(lambda: self.browse_path(line_edit, mode, filter_str))
+        btn.clicked.connect(self._on_browse_clicked)
         
         h.addWidget(line_edit)
         h.addWidget(btn)
@@ -545,6 +591,11 @@ class ProjectManagerDialog(QDialog):
         self.form_layout.addRow(label, widget)
         return line_edit
         
+    def _on_browse_clicked(self):
+        line_edit = self.sender().parent().findChild(QLineEdit)
+        if line_edit is None: return
+        self.browse_path(line_edit, line_edit.property("browse_mode"), line_edit.property("browse_filter") or "")
+
     def browse_path(self, line_edit, mode, filter_str):
         current = line_edit.text()
         path = ""
@@ -553,7 +604,7 @@ class ProjectManagerDialog(QDialog):
         else:
              path = QFileDialog.getExistingDirectory(self, "Select Directory", current)
              
-        if path:
+        if path and path != current:
             line_edit.setText(path)
             self.save_current_project()
 
@@ -563,11 +614,10 @@ class ProjectManagerDialog(QDialog):
         projects = self.config_manager.get_projects()
         current = self.config_manager.get_active_project()
         
-        sel_row = 0
-        for i, p in enumerate(projects):
+        for p in projects:
             self.list_projects.addItem(p["name"])
-            if p["name"] == current["name"]:
-                sel_row = i
+        current_p = self.config_manager.get_project_map().get(current["name"])
+        sel_row = projects.index(current_p) if current_p is not None else 0
                 
         # If we just renamed, try to keep selection on renamed item
         if self.current_project_original_name:
@@ -578,6 +628,10 @@ class ProjectManagerDialog(QDialog):
         self.load_selected_project() # Force reload fields
         
     def load_selected_project(self):
+        # 切换项目前先写回上一项目的未保存修改
+        if self._project_save_timer.isActive():
+            self._project_save_timer.stop()
+            self.save_current_project()
         row = self.list_projects.currentRow()
         if row < 0: 
             self.form_widget.setEnabled(False)
@@ -627,17 +681,14 @@ class ProjectManagerDialog(QDialog):
         if not p: return
         
         # 1. Handle Rename
+        old_name = self.current_project_original_name
         new_name = self.inp_name.text().strip()
-        if new_name and new_name != self.current_project_original_name:
-            if self.config_manager.get_project(new_name):
+        if new_name and new_name != old_name:
+            if not self.config_manager.rename_project(self.current_project_original_name, new_name):
                 QMessageBox.warning(self, "Error", "Project name already exists!")
                 self.inp_name.setText(self.current_project_original_name) # Revert
                 return
             else:
-                p["name"] = new_name
-                if self.config_manager.data["active_project"] == self.current_project_original_name:
-                    self.config_manager.data["active_project"] = new_name
-                
                 self.current_project_original_name = new_name
                 
         # 2. Save Fields
@@ -666,18 +717,14 @@ class ProjectManagerDialog(QDialog):
         
         self.config_manager.save()
         
-        current_list_item = self.list_projects.currentItem()
-        if current_list_item and current_list_item.text() != self.current_project_original_name:
-             current_list_item.setText(self.current_project_original_name)
+        # 延迟保存可能在切换选中项之后才执行，按原名找到对应条目，不能用 currentItem()
+        if old_name != self.current_project_original_name:
+            for item in self.list_projects.findItems(old_name, Qt.MatchFlag.MatchExactly):
+                item.setText(self.current_project_original_name)
 
     def block_signals_inputs(self, block):
-        inputs = [self.inp_pdf, self.inp_img_dir, self.inp_left_txt, self.inp_right_txt, 
-                  self.inp_ocr_json, self.inp_export_dir, self.inp_reg_l, self.inp_reg_r, self.inp_name,
-                  self.spin_start, self.spin_end, self.spin_offset,
-                  self.spin_reg_grp_l, self.spin_reg_grp_r]
-        for inp in inputs:
-            if hasattr(inp, 'blockSignals'):
-                inp.blockSignals(block)
+        for inp in self._inputs:
+            inp.blockSignals(block)
 
     def add_right_candidate(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select Right Text", "", "Text (*.txt)")
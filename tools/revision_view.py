@@ -1,5 +1,3 @@
-import difflib
-
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QColor, QKeySequence, QTextCharFormat, QTextCursor, QTextFormat
 from PyQt6.QtWidgets import (
@@ -13,6 +11,8 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from tools.diff_utils import compute_opcodes
+
 
 REVISION_GROUP_PROPERTY = int(QTextFormat.Property.UserProperty) + 1
 REVISION_TYPE_PROPERTY = int(QTextFormat.Property.UserProperty) + 2
@@ -319,7 +319,7 @@ class RevisionViewWidget(QWidget):
 
         target = self.left_text if self.target_side() == "left" else self.right_text
         source = self.right_text if self.target_side() == "left" else self.left_text
-        opcodes = difflib.SequenceMatcher(None, target, source, autojunk=False).get_opcodes()
+        opcodes = compute_opcodes(target, source)
 
         self._building = True
         self.editor.blockSignals(True)
@@ -1,49 +1,107 @@
 import os
 import re
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, 
                              QPushButton, QFormLayout, QComboBox, 
                              QDialogButtonBox, QFileDialog, QMessageBox)
 
 PAGE_PATTERN = re.compile(r"<(\d+)>")
+# 整行只有 <页码>（两侧可有空白）的分页标记行
+PAGE_LINE_PATTERN = re.compile(r"^[^\S\n]*<(\d+)>[^\S\n]*$", re.MULTILINE)
 
 def read_text_to_pages(file_path: str) -> dict[int, str]:
     pages = {}
     if not os.path.exists(file_path): 
         return pages
     try:
-        current_page = None
-        current_content = []
         with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.rstrip("\n")
-                match = PAGE_PATTERN.fullmatch(line.strip())
-                if match:
-                    if current_page is not None:
-                        pages[current_page] = "\n".join(current_content)
-                    current_page = int(match.group(1))
-                    current_content = []
-                else:
-                    current_content.append(line)
+            data = f.read()
+        # 一次正则扫描找出所有分页标记，页内容直接按偏移切片，不再逐行处理
+        current_page = None
+        content_start = 0
+        for match in PAGE_LINE_PATTERN.finditer(data):
             if current_page is not None:
-                pages[current_page] = "\n".join(current_content)
+                pages[current_page] = data[content_start:max(content_start, match.start() - 1)]
+            current_page = int(match.group(1))
+            content_start = match.end() + 1
+        if current_page is not None:
+            content = data[content_start:]
+            pages[current_page] = content[:-1] if content.endswith("\n") else content
     except Exception as e:
         print(f"Read error {file_path}: {e}")
     return pages
 
 def write_pages_to_file(pages: dict[int, str], file_path: str):
+    # 先写临时文件再替换，写到一半失败不会损坏原文件
+    tmp_path = file_path + ".tmp"
     try:
-        sorted_pages = sorted(pages.keys())
-        with open(file_path, 'w', encoding='utf8') as f:
-            for page in sorted_pages:
-                text = pages[page]
-                f.write(f'<{page}>\n')
-                f.write(f'{text}\n')
+        # 拼成一个字符串一次写出，省去每页两次 write 调用
+        payload = "".join([f'<{page}>\n{pages[page]}\n' for page in sorted(pages)])
+        with open(tmp_path, 'w', encoding='utf8') as f:
+            f.write(payload)
+        os.replace(tmp_path, file_path)
         print(f"Saved to {file_path}")
         return True
     except Exception as e:
         print(f"Save error: {e}")
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
         return False
 
+class PageFileWriter(QThread):
+    """后台写出分页文本；同一路径排队中的旧内容会被最新一次提交覆盖"""
+    saved = pyqtSignal(str, bool, int) # (path, success, 本次写入包含的最后一次提交编号)
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._jobs = {} # {path: (pages, ticket)}
+        self._ticket = 0
+        self._busy = False
+        self._stopping = False
+
+    def submit(self, pages: dict[int, str], file_path: str) -> int:
+        """排队写出，返回提交编号；saved 信号带回该文件写入时覆盖到的最新编号"""
+        with self._cond:
+            self._ticket += 1
+            self._jobs[file_path] = (dict(pages), self._ticket)
+            self._cond.notify_all()
+            return self._ticket
+
+    def wait_idle(self):
+        """阻塞直到所有已提交的文件写完（读取同一文件前调用）"""
+        if not self.isRunning():
+            return
+        with self._cond:
+            while self._jobs or self._busy:
+                self._cond.wait()
+
+    def stop(self):
+        """写完排队中的文件后退出"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._stopping:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                file_path = next(iter(self._jobs))
+                pages, ticket = self._jobs.pop(file_path)
+                self._busy = True
+            ok = write_pages_to_file(pages, file_path)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            self.saved.emit(file_path, ok, ticket)
+
 class MergeTextDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -0,0 +1,60 @@
+import bisect
+import re
+
+# Qt 的文本位置以 UTF-16 码元计，BMP 以外的字符占两个码元；
+# 只记录这些字符的位置，两个方向的换算都是一次二分查找。
+_ASTRAL_RE = re.compile('[\U00010000-\U0010FFFF]')
+_astral_cache = [] # [(text, py_starts, qt_starts)]，最近使用的在前
+
+def _astral_positions(full_text: str):
+    """Python indices and Qt positions of characters outside the BMP (two UTF-16 units each)."""
+    # 左右两个编辑器交替查询，各保留一份
+    for cached_text, py_starts, qt_starts in _astral_cache:
+        if full_text is cached_text:
+            return py_starts, qt_starts
+    for cached_text, py_starts, qt_starts in _astral_cache:
+        if full_text == cached_text:
+            return py_starts, qt_starts
+    # UTF-16 编码只在 C 层走一遍，比正则扫描快得多；长度恰为两倍说明没有代理对
+    if full_text.isascii() or len(full_text.encode('utf-16-le')) == 2 * len(full_text):
+        py_starts = []
+    else:
+        py_starts = [m.start() for m in _ASTRAL_RE.finditer(full_text)]
+    qt_starts = [p + k for k, p in enumerate(py_starts)]
+    _astral_cache.insert(0, (full_text, py_starts, qt_starts))
+    del _astral_cache[2:]
+    return py_starts, qt_starts
+
+def to_qt_pos(full_text: str, py_pos: int) -> int:
+    """Convert Python string index to Qt TextCursor position (UTF-16 code units)."""
+    if py_pos < 0:
+        py_pos = max(0, len(full_text) + py_pos) # 与切片 full_text[:py_pos] 的语义一致
+    py_pos = min(py_pos, len(full_text))
+    py_starts, _qt_starts = _astral_positions(full_text)
+    return py_pos + bisect.bisect_left(py_starts, py_pos)
+
+def to_qt_positions(full_text: str, py_positions) -> list[int]:
+    """to_qt_pos for many non-negative, ascending Python indices in one merged pass."""
+    n = len(full_text)
+    py_starts, _qt_starts = _astral_positions(full_text)
+    if not py_starts:
+        return [min(p, n) for p in py_positions]
+    result = []
+    k, m = 0, len(py_starts)
+    for p in py_positions:
+        p = min(p, n)
+        while k < m and py_starts[k] < p:
+            k += 1
+        result.append(p + k)
+    return result
+
+def to_py_pos(full_text: str, qt_pos: int) -> int:
+    """Convert Qt TextCursor position to Python string index."""
+    if qt_pos <= 0 or not full_text:
+        return 0
+    _py_starts, qt_starts = _astral_positions(full_text)
+    k = bisect.bisect_left(qt_starts, qt_pos)
+    py_pos = qt_pos - k
+    if k and qt_starts[k - 1] == qt_pos - 1:
+        py_pos += 1 # 落在代理对中间，归到下一个字符
+    return min(py_pos, len(full_text))